@@ -5,53 +5,78 @@ Processes JSON files and inserts data into PostgreSQL with real-time stats outpu
 """
 
 import os
-import json
-import psycopg2
-import psycopg2.extras
-from psycopg2.pool import ThreadedConnectionPool
 import time
 import logging
 import argparse
-from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, Any
 from dotenv import load_dotenv
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from threading import Lock
+from services.migration.base import BaseMigrator
+from services.migration.logger import attach_queue_listener
 from services.migration.stats_writer import StatsWriter
 from services.migration.test_run_manager import TestRunManager
 
 # Load environment variables
 load_dotenv()
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
+logger = logging.getLogger(__name__)
+
+
+def setup_logging():
+    """Log to migration.log and the console through a background listener, so batch logging never blocks on I/O"""
+    # Called from main() rather than at import, so prepare worker processes that re-import
+    # this module do not open the log file or start listeners of their own
+    handlers = [
         logging.FileHandler('migration.log'),
         logging.StreamHandler()
     ]
-)
-logger = logging.getLogger(__name__)
+    for handler in handlers:
+        handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    logging.getLogger().setLevel(logging.INFO)
+    attach_queue_listener(logging.getLogger(), *handlers)
 
 
-class CLIDataMigrator:
+class CLIDataMigrator(BaseMigrator):
     """Command-line data migrator with stats output"""
 
-    def __init__(self, batch_size: int = 1000, num_connections: int = 1, max_records: int = None):
-        self.conn = None
-        self.pool = None
+    # Filename prefix -> target table; the first matching prefix wins
+    _PREFIX_MAP = (
+        ("PubDataOpnStdService_ScsBidInfo_", "opn_std_scsbid_info"),
+    )
+
+    # Buffered batch stats are also flushed once they are this many seconds old
+    STATS_FLUSH_SECONDS = 2.0
+
+    def __init__(self, batch_size: int = 1000, num_connections: int = 1, max_records: int = None,
+                 stats_flush_interval: int = 50, drop_indexes: bool = False, unlogged: bool = False,
+                 server_side_id: bool = False, insert_method: str = "copy", prepare_processes: int = 0,
+                 fast_unsafe: bool = False, staging: bool = False, commit_every: int = 1,
+                 exact_counts: bool = False, auto_batch_size: bool = False):
+        super().__init__(
+            batch_size=batch_size,
+            num_connections=num_connections,
+            max_records=max_records,
+            drop_indexes=drop_indexes,
+            unlogged=unlogged,
+            server_side_id=server_side_id,
+            insert_method=insert_method,
+            prepare_processes=prepare_processes,
+            fast_unsafe=fast_unsafe,
+            staging=staging,
+            commit_every=commit_every,
+            exact_counts=exact_counts,
+            auto_batch_size=auto_batch_size,
+            logger=logger
+        )
         self.cloud_provider = os.getenv('CLOUD_PROVIDER', 'Unknown')
         self.instance_type = os.getenv('INSTANCE_TYPE', 'Unknown')
         self.env = os.getenv('ENV', 'CLOUD POSTGRESQL')
-        self.batch_size = batch_size
-        self.num_connections = num_connections
-        self.max_records = max_records
-        self.total_records_inserted = 0
-        self.max_records_reached = False
-        self.batch_performance_stats = []
-        self.stats_lock = Lock()
+
+        # Batch stats are buffered and written to disk every stats_flush_interval batches
+        # or every STATS_FLUSH_SECONDS, whichever comes first
+        self.stats_flush_interval = max(1, stats_flush_interval)
+        self._pending_batch_stats = []
+        self._last_stats_flush = time.perf_counter()
 
         # Initialize test run manager and create new test run
         self.test_manager = TestRunManager()
@@ -76,589 +101,53 @@ class CLIDataMigrator:
 
         self.connect_to_db()
 
-    def connect_to_db(self):
-        """Create PostgreSQL connection pool"""
-        try:
-            # Create connection pool with extra connection for schema queries
-            # Total = num_connections (for parallel workers) + 1 (for self.conn)
-            self.pool = ThreadedConnectionPool(
-                minconn=1,
-                maxconn=self.num_connections + 1,
-                host=os.getenv('GCP_DB_HOST'),
-                port=os.getenv('GCP_DB_PORT', 5432),
-                database=os.getenv('GCP_DB_NAME'),
-                user=os.getenv('GCP_DB_USER'),
-                password=os.getenv('GCP_DB_PASSWORD'),
-                # sslmode='require'
-            )
-            # Get one connection from pool for schema queries
-            self.conn = self.pool.getconn()
-            logger.info(f"Successfully created connection pool (total: {self.num_connections + 1}, workers: {self.num_connections})")
-        except Exception as e:
-            logger.error(f"Failed to create connection pool: {e}")
-            raise
-
-    def get_connection(self):
-        """Get a connection from the pool"""
-        return self.pool.getconn()
-
-    def return_connection(self, conn):
-        """Return a connection to the pool"""
-        self.pool.putconn(conn)
-
-    def get_table_name_from_filename(self, filename: str) -> Optional[str]:
-        """Extract table name from filename"""
-        if filename.startswith("PubDataOpnStdService_ScsBidInfo_"):
-            return "opn_std_scsbid_info"
-        else:
-            logger.warning(f"Unknown file pattern: {filename}")
-            return None
-
-    def get_table_columns(self, table_name: str) -> List[str]:
-        """Get column names for a table (excluding auto-generated columns)"""
-        try:
-            cur = self.conn.cursor()
-            cur.execute("""
-                SELECT column_name
-                FROM information_schema.columns
-                WHERE table_name = %s
-                AND column_name NOT IN ('createdAt', 'updatedAt', 'id')
-                ORDER BY ordinal_position;
-            """, (table_name,))
-
-            columns = [row[0] for row in cur.fetchall()]
-            cur.close()
-            return columns
-        except Exception as e:
-            logger.error(f"Failed to get columns for {table_name}: {e}")
-            return []
-
-    def prepare_record_data(self, record: Dict[str, Any], table_columns: List[str]) -> Dict[str, Any]:
-        """Prepare record data to match table columns"""
-        prepared_data = {}
-
-        for column in table_columns:
-            if column in record:
-                value = record[column]
-                # Treat None and empty strings as NULL
-                if value is None or value == '':
-                    prepared_data[column] = None
-                else:
-                    prepared_data[column] = str(value) if not isinstance(value, str) else value
-            else:
-                prepared_data[column] = None
-
-        return prepared_data
-
-    def _insert_batch_worker(self, table_name: str, table_columns: List[str],
-                            batch_records: List[Dict[str, Any]], batch_number: int,
-                            start_offset: int) -> Dict[str, Any]:
-        """Worker function to insert a single batch using a connection from the pool"""
-        batch_start_time = time.time()
-
-        # Initialize variables for error logging
-        conn = None
-        insert_sql = None
-        batch_data = []
-
-        try:
-            # Get connection from pool
-            conn = self.get_connection()
-            cur = conn.cursor()
-
-            # Data preparation phase
-            data_prep_start = time.time()
-            for record in batch_records:
-                prepared_data = self.prepare_record_data(record, table_columns)
-                batch_data.append(prepared_data)
-
-            if batch_data:
-                # Generate composite ID for each record
-                for j, data in enumerate(batch_data):
-                    data['id'] = f"{data.get('bidNtceNo', '')}_{data.get('bidNtceOrd', '')}_{start_offset+j+1}"
-
-                # Quote column names to preserve case sensitivity
-                quoted_columns = '"id", ' + ', '.join([f'"{col}"' for col in table_columns])
-                placeholders = '%(id)s, ' + ', '.join([f'%({col})s' for col in table_columns])
-
-                # Add timestamp columns
-                quoted_columns += ', "createdAt", "updatedAt"'
-                placeholders += ', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP'
-
-                insert_sql = f"INSERT INTO {table_name} ({quoted_columns}) VALUES ({placeholders})"
-
-                data_prep_end = time.time()
-                data_preparation_time = data_prep_end - data_prep_start
-
-                # Execute batch (query execution phase)
-                query_exec_start = time.time()
-                cur.executemany(insert_sql, batch_data)
-                query_exec_end = time.time()
-                query_execution_time = query_exec_end - query_exec_start
-
-                # Commit phase
-                commit_start = time.time()
-                conn.commit()
-                commit_end = time.time()
-                commit_time = commit_end - commit_start
-
-            cur.close()
-            batch_end_time = time.time()
-
-            # Calculate performance metrics
-            batch_duration = batch_end_time - batch_start_time
-            records_per_second = len(batch_data) / batch_duration if batch_duration > 0 else 0
-            network_db_time = query_execution_time + commit_time
-            overhead_time = batch_duration - data_preparation_time - network_db_time
-
-            return {
-                "success": True,
-                "batch_number": batch_number,
-                "table_name": table_name,
-                "records_count": len(batch_data),
-                "start_time": datetime.fromtimestamp(batch_start_time).isoformat(),
-                "end_time": datetime.fromtimestamp(batch_end_time).isoformat(),
-                "total_duration_seconds": batch_duration,
-                "data_preparation_time": data_preparation_time,
-                "query_execution_time": query_execution_time,
-                "commit_time": commit_time,
-                "network_db_time": network_db_time,
-                "overhead_time": overhead_time,
-                "records_per_second": records_per_second
-            }
-
-        except Exception as e:
-            logger.error(f"Failed to insert batch {batch_number} into {table_name}: {e}")
-
-            # Log failed SQL and sample data for debugging
-            if insert_sql:
-                logger.error(f"Failed SQL: {insert_sql}")
-            if batch_data:
-                logger.error(f"Sample failed data (first record): {batch_data[0]}")
-                logger.error(f"Total records in failed batch: {len(batch_data)}")
-
-            if conn:
-                conn.rollback()
-            return {
-                "success": False,
-                "batch_number": batch_number,
-                "error": str(e)
-            }
-        finally:
-            # Return connection to pool if it was obtained
-            if conn:
-                self.return_connection(conn)
-
-    def _insert_batch_parallel(self, table_name: str, records: List[Dict[str, Any]],
-                               batch_size: int, table_columns: List[str]) -> int:
-        """Insert records using multiple parallel connections"""
-        total_inserted = 0
-
-        # Split records into batches, considering max_records limit
-        batches = []
-        for i in range(0, len(records), batch_size):
-            # Check if we've already reached the max_records limit
-            if self.max_records and self.total_records_inserted >= self.max_records:
-                self.max_records_reached = True
-                break
-
-            batch = records[i:i + batch_size]
-
-            # If this batch would exceed max_records, trim it
-            if self.max_records and self.total_records_inserted + len(batch) > self.max_records:
-                remaining = self.max_records - self.total_records_inserted
-                batch = batch[:remaining]
-                batch_number = i // batch_size + 1
-                batches.append((batch, batch_number, i))
-                self.max_records_reached = True
-                logger.info(f"Trimming final batch to {remaining} records to reach max limit of {self.max_records:,}")
-                break
-
-            batch_number = i // batch_size + 1
-            batches.append((batch, batch_number, i))
-
-        logger.info(f"Processing {len(batches)} batches using {self.num_connections} connections")
-
-        # Process batches in parallel using ThreadPoolExecutor
-        with ThreadPoolExecutor(max_workers=self.num_connections) as executor:
-            # Submit all batch jobs
-            future_to_batch = {}
-            for batch_records, batch_number, start_offset in batches:
-                # Submit job - worker will get connection from pool internally
-                future = executor.submit(
-                    self._insert_batch_worker,
-                    table_name, table_columns, batch_records, batch_number, start_offset
-                )
-                future_to_batch[future] = batch_number
-
-            # Collect results as they complete
-            for future in as_completed(future_to_batch):
-                batch_number = future_to_batch[future]
-                try:
-                    result = future.result()
-
-                    if result["success"]:
-                        total_inserted += result["records_count"]
-                        self.total_records_inserted += result["records_count"]
-
-                        # Thread-safe stats collection
-                        with self.stats_lock:
-                            batch_stat = {
-                                "batch_number": result["batch_number"],
-                                "table_name": result["table_name"],
-                                "records_count": result["records_count"],
-                                "start_time": result["start_time"],
-                                "end_time": result["end_time"],
-                                "total_duration_seconds": result["total_duration_seconds"],
-                                "data_preparation_time": result["data_preparation_time"],
-                                "query_execution_time": result["query_execution_time"],
-                                "commit_time": result["commit_time"],
-                                "network_db_time": result["network_db_time"],
-                                "overhead_time": result["overhead_time"],
-                                "records_per_second": result["records_per_second"],
-                                "cumulative_records": total_inserted
-                            }
-                            self.batch_performance_stats.append(batch_stat)
-
-                            # Write to stats file
-                            self.stats_writer.add_batch_stat(batch_stat)
-
-                            # Update progress
-                            self.stats_writer.update_progress(
-                                current_batch=result["batch_number"],
-                                total_records_processed=total_inserted
-                            )
-
-                        # Log progress
-                        logger.info(f"Batch {result['batch_number']} for {table_name}: "
-                                  f"{result['records_count']} records in "
-                                  f"{result['total_duration_seconds']:.3f}s "
-                                  f"({result['records_per_second']:.1f} rec/s)")
-
-                        # Check if max_records reached after this batch
-                        if self.max_records and self.total_records_inserted >= self.max_records:
-                            self.max_records_reached = True
-                            logger.info(f"Maximum record limit ({self.max_records:,}) reached in parallel processing.")
-
-                            # Cancel all pending futures that haven't started yet
-                            cancelled_count = 0
-                            for f in future_to_batch:
-                                if not f.done():
-                                    if f.cancel():
-                                        cancelled_count += 1
-
-                            if cancelled_count > 0:
-                                logger.info(f"Cancelled {cancelled_count} pending batches")
-
-                            break  # Exit the result collection loop
-                    else:
-                        logger.error(f"Batch {batch_number} failed: {result.get('error', 'Unknown error')}")
-
-                except Exception as e:
-                    logger.error(f"Exception processing batch {batch_number}: {e}")
-
-        logger.info(f"Total inserted into {table_name}: {total_inserted} records using {self.num_connections} connections")
-        return total_inserted
-
-    def insert_batch(self, table_name: str, records: List[Dict[str, Any]], batch_size: int = None) -> int:
-        """Insert records in batches with performance monitoring and multi-connection support"""
-        if not records:
-            return 0
-
-        # Use instance batch_size if not provided
-        if batch_size is None:
-            batch_size = self.batch_size
-
-        table_columns = self.get_table_columns(table_name)
-        if not table_columns:
-            logger.error(f"No columns found for table {table_name}")
-            return 0
-
-        total_inserted = 0
-
-        # Use multi-connection if configured
-        if self.num_connections > 1:
-            return self._insert_batch_parallel(table_name, records, batch_size, table_columns)
-
-        # Single connection implementation (original logic)
-        try:
-            cur = self.conn.cursor()
-
-            for i in range(0, len(records), batch_size):
-                # Check if max_records limit reached
-                if self.max_records and self.total_records_inserted >= self.max_records:
-                    self.max_records_reached = True
-                    logger.info(f"Maximum record limit ({self.max_records:,}) reached. Stopping batch processing.")
-                    break
-
-                batch_start_time = time.time()
-                batch_number = i // batch_size + 1
-
-                batch = records[i:i + batch_size]
-
-                # If this batch would exceed max_records, trim it
-                if self.max_records and self.total_records_inserted + len(batch) > self.max_records:
-                    remaining = self.max_records - self.total_records_inserted
-                    batch = batch[:remaining]
-                    self.max_records_reached = True
-                    logger.info(f"Trimming batch to {remaining} records to reach max limit of {self.max_records:,}")
-
-                batch_data = []
-
-                # Data preparation phase
-                data_prep_start = time.time()
-                for record in batch:
-                    prepared_data = self.prepare_record_data(record, table_columns)
-                    batch_data.append(prepared_data)
-
-                if batch_data:
-                    # Generate composite ID for each record
-                    for j, data in enumerate(batch_data):
-                        data['id'] = f"{data.get('bidNtceNo', '')}_{data.get('bidNtceOrd', '')}_{i+j+1}"
-
-                    # Quote column names to preserve case sensitivity
-                    quoted_columns = '"id", ' + ', '.join([f'"{col}"' for col in table_columns])
-                    placeholders = '%(id)s, ' + ', '.join([f'%({col})s' for col in table_columns])
-
-                    # Add timestamp columns
-                    quoted_columns += ', "createdAt", "updatedAt"'
-                    placeholders += ', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP'
-
-                    insert_sql = f"INSERT INTO {table_name} ({quoted_columns}) VALUES ({placeholders})"
-
-                    data_prep_end = time.time()
-                    data_preparation_time = data_prep_end - data_prep_start
-
-                    # Execute batch (query execution phase)
-                    query_exec_start = time.time()
-                    cur.executemany(insert_sql, batch_data)
-                    query_exec_end = time.time()
-                    query_execution_time = query_exec_end - query_exec_start
-
-                    # Commit phase
-                    commit_start = time.time()
-                    self.conn.commit()
-                    commit_end = time.time()
-                    commit_time = commit_end - commit_start
-
-                    total_inserted += len(batch_data)
-                    self.total_records_inserted += len(batch_data)
-                    batch_end_time = time.time()
-
-                    # Calculate performance metrics
-                    batch_duration = batch_end_time - batch_start_time
-                    records_per_second = len(batch_data) / batch_duration if batch_duration > 0 else 0
-                    network_db_time = query_execution_time + commit_time
-                    overhead_time = batch_duration - data_preparation_time - network_db_time
-
-                    # Store batch performance stats
-                    batch_stat = {
-                        "batch_number": batch_number,
-                        "table_name": table_name,
-                        "records_count": len(batch_data),
-                        "start_time": datetime.fromtimestamp(batch_start_time).isoformat(),
-                        "end_time": datetime.fromtimestamp(batch_end_time).isoformat(),
-                        "total_duration_seconds": batch_duration,
-                        "data_preparation_time": data_preparation_time,
-                        "query_execution_time": query_execution_time,
-                        "commit_time": commit_time,
-                        "network_db_time": network_db_time,
-                        "overhead_time": overhead_time,
-                        "records_per_second": records_per_second,
-                        "cumulative_records": total_inserted
-                    }
-                    self.batch_performance_stats.append(batch_stat)
-
-                    # Write to stats file
-                    self.stats_writer.add_batch_stat(batch_stat)
-
-                    # Update progress
-                    self.stats_writer.update_progress(
-                        current_batch=batch_number,
-                        total_records_processed=total_inserted
-                    )
-
-                    # Log progress
-                    logger.info(f"Batch {batch_number} for {table_name}: {len(batch_data)} records in {batch_duration:.3f}s ({records_per_second:.1f} rec/s)")
-
-                    # Break if max_records reached
-                    if self.max_records_reached:
-                        break
-
-            cur.close()
-            logger.info(f"Total inserted into {table_name}: {total_inserted} records")
-
-        except Exception as e:
-            logger.error(f"Failed to insert batch into {table_name}: {e}")
-            self.conn.rollback()
-            raise
-
-        return total_inserted
-
-    def process_file(self, file_path: Path) -> Dict[str, Any]:
-        """Process a single JSON file"""
-        filename = file_path.name
-        table_name = self.get_table_name_from_filename(filename)
-
-        if not table_name:
-            return {"filename": filename, "status": "skipped", "reason": "unknown file pattern"}
-
-        try:
-            logger.info(f"Processing {filename} -> {table_name}")
-
-            # Update progress
-            self.stats_writer.update_progress(current_file=filename)
-
-            # Read and parse JSON file
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-
-            if not isinstance(data, list):
-                logger.warning(f"Expected list in {filename}, got {type(data)}")
-                return {"filename": filename, "status": "error", "reason": "invalid data format"}
-
-            # Insert data
-            inserted_count = self.insert_batch(table_name, data)
-
-            result = {
-                "filename": filename,
-                "table": table_name,
-                "status": "success",
-                "records_processed": len(data),
-                "records_inserted": inserted_count
-            }
-
-            # Mark file as completed
-            self.stats_writer.complete_file(result)
-
-            return result
-
-        except Exception as e:
-            logger.error(f"Failed to process {filename}: {e}")
-            return {
-                "filename": filename,
-                "table": table_name,
-                "status": "error",
-                "reason": str(e)
-            }
-
-    def migrate_all_files(self, data_dir: str = "data") -> List[Dict[str, Any]]:
-        """Process all JSON files in the data directory"""
-        data_path = Path(data_dir)
-
-        if not data_path.exists():
-            raise FileNotFoundError(f"Data directory {data_dir} not found")
-
-        # Get all JSON files except sample_data.json
-        json_files = [f for f in data_path.glob("*.json") if f.name != "sample_data.json"]
-
-        if not json_files:
-            logger.warning("No JSON files found to process")
-            return []
-
-        logger.info(f"Found {len(json_files)} files to process")
-
-        # Start migration
-        self.stats_writer.start_migration(total_files=len(json_files))
-
-        results = []
-
-        for file_path in sorted(json_files):
-            try:
-                result = self.process_file(file_path)
-                results.append(result)
-
-                # Log progress
-                if result["status"] == "success":
-                    logger.info(f"✓ {result['filename']}: {result['records_inserted']} records inserted")
-                else:
-                    logger.warning(f"✗ {result['filename']}: {result.get('reason', 'unknown error')}")
-
-                # Check if max_records limit reached
-                if self.max_records_reached:
-                    logger.info(f"Maximum record limit ({self.max_records:,}) reached. Stopping migration.")
-                    logger.info(f"Total records inserted: {self.total_records_inserted:,}")
-                    break
-
-            except KeyboardInterrupt:
-                logger.info("Migration interrupted by user")
-                self.stats_writer.error_migration("Interrupted by user")
-                break
-            except Exception as e:
-                logger.error(f"Unexpected error processing {file_path.name}: {e}")
-                results.append({
-                    "filename": file_path.name,
-                    "status": "error",
-                    "reason": str(e)
-                })
-
-        return results
-
-    def print_summary(self, results: List[Dict[str, Any]]):
-        """Print migration summary"""
-        successful = [r for r in results if r["status"] == "success"]
-        failed = [r for r in results if r["status"] == "error"]
-        skipped = [r for r in results if r["status"] == "skipped"]
-
-        total_records = sum(r.get("records_inserted", 0) for r in successful)
-
-        print("\n" + "="*60)
-        print("MIGRATION SUMMARY")
-        print("="*60)
-        print(f"Total files processed: {len(results)}")
-        print(f"Successful: {len(successful)}")
-        print(f"Failed: {len(failed)}")
-        print(f"Skipped: {len(skipped)}")
-        print(f"Total records inserted: {total_records:,}")
-
-        if self.max_records:
-            print(f"Maximum records limit: {self.max_records:,}")
-            if self.max_records_reached:
-                print("⚠️  LIMIT REACHED: Migration stopped due to max_records limit")
-
-        if successful:
-            print("\n✓ SUCCESSFUL FILES:")
-            for result in successful:
-                print(f"  {result['filename']} -> {result['table']}: {result['records_inserted']:,} records")
-
-        if failed:
-            print("\n✗ FAILED FILES:")
-            for result in failed:
-                print(f"  {result['filename']}: {result['reason']}")
-
-        if skipped:
-            print("\n⚠ SKIPPED FILES:")
-            for result in skipped:
-                print(f"  {result['filename']}: {result['reason']}")
+    def _on_batch_complete(self, batch_stat: Dict[str, Any]):
+        """Buffer a batch stat, flushing to the stats files once the interval is reached"""
+        self._pending_batch_stats.append(batch_stat)
+        if (len(self._pending_batch_stats) >= self.stats_flush_interval
+                or time.perf_counter() - self._last_stats_flush >= self.STATS_FLUSH_SECONDS):
+            self._flush_batch_stats()
+
+    def _on_insert_complete(self):
+        """Flush buffered stats at the file boundary"""
+        self._flush_batch_stats()
+
+    def _flush_batch_stats(self):
+        """Write buffered batch stats and the latest progress to the stats files"""
+        if not self._pending_batch_stats:
+            return
+
+        pending = self._pending_batch_stats
+        self._pending_batch_stats = []
+        self._last_stats_flush = time.perf_counter()
+
+        self.stats_writer.add_batch_stats(pending)
+        self.stats_writer.update_progress(
+            current_batch=pending[-1]["batch_number"],
+            total_records_processed=pending[-1]["cumulative_records"]
+        )
 
-        print("="*60)
+    def _on_file_start(self, filename: str):
+        """Record the file being processed"""
+        self.stats_writer.update_progress(current_file=filename)
 
-    def get_table_counts(self) -> Dict[str, int]:
-        """Get record counts for all tables"""
-        tables = ['opn_std_scsbid_info']
+    def _on_file_complete(self, result: Dict[str, Any]):
+        """Mark file as completed"""
+        self.stats_writer.complete_file(result)
 
-        counts = {}
-        try:
-            cur = self.conn.cursor()
-            for table in tables:
-                cur.execute(f'SELECT COUNT(*) FROM {table}')
-                counts[table] = cur.fetchone()[0]
-            cur.close()
-        except Exception as e:
-            logger.error(f"Failed to get table counts: {e}")
+    def _on_migration_start(self, total_files: int):
+        """Start migration in the stats files"""
+        self.stats_writer.start_migration(total_files=total_files)
 
-        return counts
+    def _on_migration_error(self, message: str):
+        """Record an interrupted migration in the stats files"""
+        self._flush_batch_stats()
+        self.stats_writer.error_migration(message)
 
     def close(self):
-        """Close database connections and pool"""
-        if self.pool:
-            # Return the main connection to the pool first
-            if self.conn:
-                self.pool.putconn(self.conn)
-                self.conn = None
-            # Close all connections in the pool
-            self.pool.closeall()
-            logger.info("Database connection pool closed")
+        """Write any buffered batch stats, then close database connections"""
+        self._flush_batch_stats()
+        super().close()
 
 
 def main():
@@ -667,6 +156,9 @@ def main():
     parser.add_argument('--batch-size', type=int, default=1000,
                         choices=[10, 100, 500, 1000, 2000, 5000],
                         help='Batch size for insert operations (default: 1000)')
+    parser.add_argument('--auto-batch-size', action='store_true',
+                        help='Probe batch sizes of 100/400/1600/6400 on the first batches of each table and '
+                             'keep the fastest; --batch-size is used until every probe has finished')
     parser.add_argument('--connections', type=int, default=1,
                         choices=[1, 2, 5, 10, 20, 30, 50, 80],
                         help='Number of concurrent database connections (default: 1)')
@@ -674,13 +166,50 @@ def main():
                         help='Maximum number of records to insert (default: no limit)')
     parser.add_argument('--data-dir', type=str, default='data',
                         help='Data directory containing JSON files (default: data)')
+    parser.add_argument('--stats-flush-interval', type=int, default=50,
+                        help='Number of batches buffered before writing stats files; buffered stats are '
+                             'also written every 2 seconds (default: 50)')
+    parser.add_argument('--drop-indexes', action='store_true',
+                        help='Drop secondary indexes during the load and rebuild them afterwards')
+    parser.add_argument('--unlogged', action='store_true',
+                        help='Switch target tables to UNLOGGED during the load (not crash-safe)')
+    parser.add_argument('--insert-method', type=str, default='copy',
+                        choices=list(CLIDataMigrator.INSERT_METHODS),
+                        help='How batches are sent: COPY FROM STDIN, one multi-row INSERT (values), '
+                             'per-row INSERTs in one round trip (batch) or executemany INSERTs (default: copy)')
+    parser.add_argument('--server-side-id', action='store_true',
+                        help='Generate the composite id with a database sequence and trigger')
+    parser.add_argument('--staging', action='store_true',
+                        help='COPY composite id tables into an UNLOGGED staging table and build the id '
+                             'with INSERT ... SELECT per file')
+    parser.add_argument('--prepare-processes', type=int, default=0,
+                        help='Multi-connection only: worker processes used to prepare batches outside the GIL '
+                             '(default: 0, in-thread)')
+    parser.add_argument('--commit-every', type=int, default=1,
+                        help='Single connection only: commit every N batches, 0 = once per file (default: 1)')
+    parser.add_argument('--exact-counts', action='store_true',
+                        help='Report table counts with COUNT(*) instead of pg_class estimates')
+    parser.add_argument('--fast-unsafe', action='store_true',
+                        help='Run sessions with synchronous_commit=off (recent commits may be lost on a crash)')
 
     args = parser.parse_args()
+    setup_logging()
 
     migrator = CLIDataMigrator(
         batch_size=args.batch_size,
         num_connections=args.connections,
-        max_records=args.max_records
+        max_records=args.max_records,
+        stats_flush_interval=args.stats_flush_interval,
+        drop_indexes=args.drop_indexes,
+        unlogged=args.unlogged,
+        server_side_id=args.server_side_id,
+        insert_method=args.insert_method,
+        prepare_processes=args.prepare_processes,
+        fast_unsafe=args.fast_unsafe,
+        staging=args.staging,
+        commit_every=args.commit_every,
+        exact_counts=args.exact_counts,
+        auto_batch_size=args.auto_batch_size
     )
 
     print("="*60)
@@ -688,16 +217,36 @@ def main():
     print("="*60)
     print(f"Cloud Provider: {migrator.cloud_provider}")
     print(f"Instance Type: {migrator.instance_type}")
-    print(f"Batch Size: {migrator.batch_size}")
+    if migrator.auto_batch_size:
+        print(f"Batch Size: auto (probing {', '.join(map(str, migrator.AUTO_BATCH_SIZES))}, "
+              f"{migrator.batch_size} until measured)")
+    else:
+        print(f"Batch Size: {migrator.batch_size}")
     print(f"Connections: {migrator.num_connections}")
+    print(f"Insert Method: {migrator.insert_method}")
+    if migrator.prepare_processes:
+        print(f"Prepare Processes: {migrator.prepare_processes}")
     if migrator.max_records:
         print(f"Max Records Limit: {migrator.max_records:,}")
+    if migrator.drop_indexes or migrator.unlogged:
+        print(f"Bulk Load: drop_indexes={migrator.drop_indexes}, unlogged={migrator.unlogged}")
+    if migrator.commit_every != 1 and migrator.num_connections == 1:
+        print(f"Commit Every: {migrator.commit_every} batches" if migrator.commit_every else "Commit Every: file")
+    if migrator.fast_unsafe:
+        print("Durability: synchronous_commit=off")
+    if migrator.server_side_id:
+        print("ID Generation: server-side (sequence + trigger)")
+    elif migrator.staging:
+        print("ID Generation: staging table merge (INSERT ... SELECT)")
     print(f"Start time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("="*60)
 
+    # Counts are planner estimates unless --exact-counts is given
+    count_label = "" if migrator.exact_counts else " (estimated)"
+
     try:
         # Show initial table counts
-        print("\n📊 Initial table counts:")
+        print(f"\n📊 Initial table counts{count_label}:")
         initial_counts = migrator.get_table_counts()
         for table, count in initial_counts.items():
             print(f"  {table}: {count:,} records")
@@ -711,26 +260,33 @@ def main():
         # Show final results
         migrator.print_summary(results)
 
+        # Tally the file results in one pass; rows added per table stay exact even when the
+        # table counts are estimates
+        successful_count = failed_count = total_records = 0
+        added_by_table = {}
+        for r in results:
+            if r["status"] == "success":
+                successful_count += 1
+                total_records += r.get("records_inserted", 0)
+                added_by_table[r["table"]] = added_by_table.get(r["table"], 0) + r["records_inserted"]
+            elif r["status"] == "error":
+                failed_count += 1
+
         # Show final table counts
-        print("\n📊 Final table counts:")
+        print(f"\n📊 Final table counts{count_label}:")
         final_counts = migrator.get_table_counts()
         for table, count in final_counts.items():
-            initial = initial_counts.get(table, 0)
-            added = count - initial
-            print(f"  {table}: {count:,} records (+{added:,})")
+            print(f"  {table}: {count:,} records (+{added_by_table.get(table, 0):,})")
 
         # Calculate performance summary
-        successful = [r for r in results if r["status"] == "success"]
-        failed = [r for r in results if r["status"] == "error"]
-        total_records = sum(r.get("records_inserted", 0) for r in successful)
         total_duration = end_time - start_time
 
         # Save final results
         final_results = {
-            "status": "completed" if not failed else "completed_with_errors",
+            "status": "completed" if not failed_count else "completed_with_errors",
             "total_files": len(results),
-            "successful": len(successful),
-            "failed": len(failed),
+            "successful": successful_count,
+            "failed": failed_count,
             "total_records": total_records,
             "total_duration_seconds": total_duration,
             "average_records_per_second": total_records / total_duration if total_duration > 0 else 0,
@@ -738,9 +294,22 @@ def main():
             "table_counts": final_counts,
             "initial_counts": initial_counts,
             "max_records_limit": migrator.max_records,
-            "max_records_reached": migrator.max_records_reached
+            "max_records_reached": migrator.max_records_reached,
+            "drop_indexes": migrator.drop_indexes,
+            "unlogged": migrator.unlogged,
+            "server_side_id": migrator.server_side_id,
+            "insert_method": migrator.insert_method,
+            "prepare_processes": migrator.prepare_processes,
+            "fast_unsafe": migrator.fast_unsafe,
+            "staging": migrator.staging,
+            "commit_every": migrator.commit_every,
+            "exact_counts": migrator.exact_counts,
+            "auto_batch_size": migrator.auto_batch_size,
+            "tuned_batch_sizes": migrator.tuned_batch_sizes
         }
 
+        # Batch stats must be on disk before they are folded into migration_stats.json
+        migrator._flush_batch_stats()
         migrator.stats_writer.complete_migration(final_results)
 
         # Update test run manager with completion data
@@ -751,6 +320,8 @@ def main():
             average_records_per_second=total_records / total_duration if total_duration > 0 else 0
         )
 
+        for table, size in migrator.tuned_batch_sizes.items():
+            print(f"\n🎯 Auto batch size for {table}: {size}")
         print(f"\n⏱️  Total migration time: {total_duration:.2f} seconds")
         print(f"📈 Average throughput: {total_records / total_duration:.1f} records/second")
         print(f"\n✅ Test ID: {migrator.test_run.test_id}")
@@ -759,6 +330,7 @@ def main():
 
     except Exception as e:
         logger.error(f"Migration failed: {e}")
+        migrator._flush_batch_stats()
         migrator.stats_writer.error_migration(str(e))
         migrator.test_manager.error_test_run(migrator.test_run.test_id, str(e))
         raise
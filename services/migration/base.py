@@ -0,0 +1,1337 @@
+"""
+Shared PostgreSQL migration logic for the CLI and Streamlit migrators
+"""
+import io
+import mmap
+import multiprocessing
+import os
+import re
+import time
+import logging
+import ijson
+import msgspec
+import psycopg2
+import psycopg2.extras
+from psycopg2.pool import ThreadedConnectionPool
+from pathlib import Path
+from typing import Dict, Iterable, List, Any, NamedTuple, Optional, Tuple
+from itertools import islice
+from datetime import datetime, timedelta, timezone, tzinfo
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from queue import Queue
+from threading import Lock, Thread, get_ident
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+# Data files are a top-level array of record objects; the decoder validates that shape while parsing
+RECORDS_DECODER = msgspec.json.Decoder(List[Dict[str, Any]])
+
+# Prefer the C yajl2 backend for streaming large files
+try:
+    IJSON = ijson.get_backend('yajl2_c')
+except ImportError:
+    IJSON = ijson
+
+
+class TableSQL(NamedTuple):
+    """Statements and composite id layout for one target table"""
+    insert_sql: str
+    values_sql: str
+    values_template: str
+    copy_sql: str
+    # Positions of bidNtceNo/bidNtceOrd in a prepared row when the id is built client-side
+    id_source_indexes: Optional[Tuple[int, int]]
+    # Whether rows carry their file row number for a staging table instead of an id
+    number_rows: bool
+
+
+class _CountingIterator:
+    """Iterator wrapper that counts the items consumed from a stream"""
+
+    __slots__ = ("_items", "count")
+
+    def __init__(self, items: Iterable[Any]):
+        self._items = iter(items)
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        item = next(self._items)
+        self.count += 1
+        return item
+
+
+def _decode_records(file_path: Path) -> List[Dict[str, Any]]:
+    """Decode a whole data file straight from a read-only memory map"""
+    with open(file_path, 'rb') as f:
+        # mmap cannot map an empty file; let the decoder report it
+        if os.fstat(f.fileno()).st_size == 0:
+            return RECORDS_DECODER.decode(b'')
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return RECORDS_DECODER.decode(mapped)
+
+
+def _copy_text(value: Optional[str]) -> str:
+    """Escape a prepared value for COPY text format"""
+    if value is None:
+        return "\\N"
+    return value.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+# Row preparation lives at module level so batches can be prepared in worker processes
+
+def _prepare_row(record: Dict[str, Any], table_columns: List[str]) -> tuple:
+    """Prepare a record as a tuple in table column order"""
+    # Treat missing keys, None and empty strings as NULL
+    return tuple([
+        None if value is None or value == '' else value if isinstance(value, str) else str(value)
+        for value in map(record.get, table_columns)
+    ])
+
+
+def _prepare_rows(batch: List[Dict[str, Any]], table_columns: List[str],
+                  id_source_indexes: Optional[Tuple[int, int]], start_offset: int,
+                  number_rows: bool = False) -> List[tuple]:
+    """Prepare a batch as tuples in COPY/INSERT column order, prefixing the composite id or row number if needed"""
+    rows = [_prepare_row(record, table_columns) for record in batch]
+
+    # Generate composite ID for each record unless the trigger or the staging merge does it
+    if id_source_indexes is not None:
+        no_idx, ord_idx = id_source_indexes
+        rows = [
+            (f"{row[no_idx]}_{row[ord_idx]}_{start_offset+j+1}",) + row
+            for j, row in enumerate(rows)
+        ]
+    elif number_rows:
+        rows = [(str(start_offset+j+1),) + row for j, row in enumerate(rows)]
+
+    return rows
+
+
+def _copy_payload(rows: List[tuple], session_tz: tzinfo) -> str:
+    """Serialize prepared rows as COPY text format"""
+    if not rows:
+        return ''
+
+    # One timestamp literal per batch instead of CURRENT_TIMESTAMP per row. It is the wall clock of the
+    # server's session time zone, which is what CURRENT_TIMESTAMP stores in a timestamp without time zone
+    # column, so rows get the same createdAt/updatedAt whichever insert method wrote them
+    line_end = f"\t{datetime.now(session_tz).isoformat()}" * 2 + "\n"
+
+    # Fast path: join the raw values, then check with a few whole-payload scans that no value
+    # contained a tab, newline, carriage return or backslash that would have needed escaping
+    payload = ''.join(['\t'.join(['\\N' if value is None else value for value in row]) + line_end for row in rows])
+    if (payload.count('\t') == len(rows) * (len(rows[0]) + 1)
+            and payload.count('\n') == len(rows)
+            and '\r' not in payload
+            and payload.count('\\') == sum(row.count(None) for row in rows)):
+        return payload
+
+    return ''.join(['\t'.join(map(_copy_text, row)) + line_end for row in rows])
+
+
+def _prepare_batch_payload(batch: List[Dict[str, Any]], table_columns: List[str],
+                           id_source_indexes: Optional[Tuple[int, int]], start_offset: int,
+                           number_rows: bool, with_copy: bool,
+                           session_tz: tzinfo) -> Tuple[List[tuple], Optional[bytes]]:
+    """Prepare rows and, for COPY, their UTF-8 encoded payload; runs in a worker process"""
+    rows = _prepare_rows(batch, table_columns, id_source_indexes, start_offset, number_rows)
+    return rows, (_copy_payload(rows, session_tz).encode() if with_copy and rows else None)
+
+
+class BaseMigrator:
+    """Loads JSON data files into PostgreSQL; subclasses specialize the stats/progress hooks"""
+
+    # Filename prefix -> target table; the first matching prefix wins
+    _PREFIX_MAP = (
+        ("BidPublicInfoService_BID_CNSTWK_", "bid_pblanclistinfo_cnstwk"),
+        ("BidPublicInfoService_BID_SERVC_", "bid_pblanclistinfo_servc"),
+        ("BidPublicInfoService_BID_THNG_", "bid_pblanclistinfo_thng"),
+        ("BidPublicInfoService_BID_FRGCPT_", "bid_pblanclistinfo_frgcpt"),
+        ("PubDataOpnStdService_ScsBidInfo_", "opn_std_scsbid_info"),
+    )
+
+    # Tables whose primary key is the composite bidNtceNo_bidNtceOrd_<row> id
+    COMPOSITE_ID_TABLES = frozenset({"opn_std_scsbid_info"})
+
+    # libpq sslmode for the pool; None leaves it to the libpq default
+    SSLMODE = None
+
+    # Prepared batches that may wait for the single-connection writer thread
+    WRITE_QUEUE_SIZE = 4
+
+    # Files at least this large are streamed with ijson instead of decoded in one piece
+    STREAM_THRESHOLD_BYTES = 64 * 1024 * 1024
+
+    # libpq TCP keepalive/timeout settings so a dead cloud connection fails fast instead of
+    # hanging a batch (libpq already sets TCP_NODELAY on its sockets)
+    KEEPALIVE_OPTIONS = {
+        "keepalives": 1,
+        "keepalives_idle": 30,
+        "keepalives_interval": 10,
+        "keepalives_count": 3,
+        "tcp_user_timeout": 30000,
+    }
+
+    # maintenance_work_mem for rebuilding indexes dropped by --drop-indexes
+    INDEX_REBUILD_MAINTENANCE_WORK_MEM = "256MB"
+
+    # Session settings for --fast-unsafe: commits return before the WAL is flushed to disk
+    FAST_UNSAFE_OPTIONS = "-c synchronous_commit=off"
+
+    # "copy" streams each batch with COPY FROM STDIN; "values" sends one multi-row INSERT
+    # per batch via execute_values; "batch" sends the per-row INSERTs of a batch in one
+    # round trip via execute_batch; "executemany" sends one INSERT per row
+    INSERT_METHODS = ("copy", "values", "batch", "executemany")
+
+    # Batch sizes tried once per table by auto_batch_size before settling on the fastest
+    AUTO_BATCH_SIZES = (100, 400, 1600, 6400)
+
+    def __init__(self, batch_size: int = 1000, num_connections: int = 1, max_records: int = None,
+                 drop_indexes: bool = False, unlogged: bool = False, server_side_id: bool = False,
+                 insert_method: str = "copy", prepare_processes: int = 0, fast_unsafe: bool = False,
+                 staging: bool = False, commit_every: int = 1, exact_counts: bool = False,
+                 auto_batch_size: bool = False, logger: logging.Logger = None):
+        if insert_method not in self.INSERT_METHODS:
+            raise ValueError(f"Unknown insert method: {insert_method}")
+
+        self.conn = None
+        self.cur = None
+        self.pool = None
+        # TimeZone of the server sessions, used to stamp COPY rows; read in connect_to_db
+        self.session_tz: tzinfo = timezone.utc
+        self.logger = logger or logging.getLogger(__name__)
+        self.batch_size = batch_size
+        self.num_connections = num_connections
+        self.max_records = max_records
+        self.total_records_inserted = 0
+        self.max_records_reached = False
+        # get_table_counts uses COUNT(*) instead of pg_class estimates
+        self.exact_counts = exact_counts
+        self.batch_performance_stats = []
+        self.stats_lock = Lock()
+
+        # All prefixes compiled into one anchored alternation, tried in _PREFIX_MAP order
+        self._prefix_tables = {}
+        for prefix, table in self._PREFIX_MAP:
+            self._prefix_tables.setdefault(prefix, table)
+        self._prefix_re = re.compile("|".join(map(re.escape, self._prefix_tables)))
+
+        # Bulk load options: drop secondary indexes / switch tables to UNLOGGED while loading
+        self.drop_indexes = drop_indexes
+        self.unlogged = unlogged
+        self._dropped_indexes = {}
+
+        # Trade durability of the last few commits for near-zero commit latency
+        self.fast_unsafe = fast_unsafe
+
+        # Let a BEFORE INSERT trigger build the composite id instead of formatting it per row
+        self.server_side_id = server_side_id
+
+        # Load composite id tables through an UNLOGGED staging table and build the id on merge
+        self.staging = staging
+
+        # Per-table column lists and statements, built once per run
+        self._col_cache: Dict[str, List[str]] = {}
+        self._sql_cache: Dict[str, TableSQL] = {}
+
+        self.insert_method = insert_method
+
+        # Single-connection path: commit every N batches (0 = once per file)
+        self.commit_every = commit_every
+
+        # Probe AUTO_BATCH_SIZES on each table's first batches, then use the fastest;
+        # batch_size is used until every probe has finished
+        self.auto_batch_size = auto_batch_size
+        self._probes_issued: Dict[str, set] = {}
+        self._probe_batches: Dict[Tuple[str, int], int] = {}
+        self._probe_rates: Dict[str, Dict[int, float]] = {}
+        self.tuned_batch_sizes: Dict[str, int] = {}
+
+        # Optional process pool so parallel workers prepare batches outside the GIL. With a single
+        # connection the one producer would only wait on the pool, so batches are prepared in-thread
+        if prepare_processes > 0 and num_connections <= 1:
+            self.logger.info("Ignoring prepare_processes: it only applies with more than one connection")
+            prepare_processes = 0
+        self.prepare_processes = prepare_processes
+        self._prepare_pool = None
+        if prepare_processes > 0:
+            self._prepare_pool = ProcessPoolExecutor(
+                max_workers=prepare_processes,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+
+    def connect_to_db(self):
+        """Create PostgreSQL connection pool"""
+        try:
+            # Create connection pool with extra connection for schema queries
+            # Total = num_connections (for parallel workers) + 1 (for self.conn)
+            # All connections are opened up front so no batch pays for a handshake
+            pool_size = self.num_connections + 1
+            self.pool = ThreadedConnectionPool(
+                minconn=pool_size,
+                maxconn=pool_size,
+                host=os.getenv('GCP_DB_HOST'),
+                port=os.getenv('GCP_DB_PORT', 5432),
+                database=os.getenv('GCP_DB_NAME'),
+                user=os.getenv('GCP_DB_USER'),
+                password=os.getenv('GCP_DB_PASSWORD'),
+                sslmode=self.SSLMODE,
+                # COPY payloads are sent as UTF-8 bytes
+                client_encoding='UTF8',
+                options=self.FAST_UNSAFE_OPTIONS if self.fast_unsafe else None,
+                **self.KEEPALIVE_OPTIONS
+            )
+            # Get one connection from pool for schema queries
+            self.conn = self.pool.getconn()
+            # Single cursor reused for the lifetime of the migrator
+            self.cur = self.conn.cursor()
+            self.session_tz = self._query_session_timezone()
+            self.logger.info(f"Successfully created connection pool (total: {pool_size}, workers: {self.num_connections})")
+        except Exception as e:
+            self.logger.error(f"Failed to create connection pool: {e}")
+            raise
+
+    def _query_session_timezone(self) -> tzinfo:
+        """TimeZone setting of the server sessions, as a tzinfo"""
+        self.cur.execute("SELECT current_setting('TimeZone'), EXTRACT(TIMEZONE FROM now())::int")
+        name, utc_offset = self.cur.fetchone()
+        self.conn.commit()
+        try:
+            return ZoneInfo(name)
+        except (ZoneInfoNotFoundError, ValueError):
+            # Not an IANA name (e.g. a POSIX offset spec); use the current offset
+            return timezone(timedelta(seconds=utc_offset))
+
+    def get_connection(self):
+        """Get a connection from the pool"""
+        return self.pool.getconn()
+
+    def return_connection(self, conn, close: bool = False):
+        """Return a connection to the pool, closing it instead of keeping it when close is set"""
+        self.pool.putconn(conn, close=close)
+
+    def _worker_connection(self, worker_conns: Dict[int, Any]):
+        """Connection held by the calling worker thread, checked out from the pool on its first batch"""
+        thread_id = get_ident()
+        conn = worker_conns.get(thread_id)
+        if conn is not None and conn.closed:
+            # Replace a connection the server dropped
+            self.return_connection(conn, close=True)
+            conn = None
+        if conn is None:
+            conn = self.get_connection()
+            worker_conns[thread_id] = conn
+        return conn
+
+    # Hooks for subclasses
+
+    def _report_error(self, message: str):
+        """Surface an error to the user"""
+        self.logger.error(message)
+
+    def _on_batch_complete(self, batch_stat: Dict[str, Any]):
+        """Called for every committed batch, serialized by stats_lock or the writer thread"""
+
+    def _on_insert_complete(self):
+        """Called once all batches of a file have been written"""
+
+    def _on_file_start(self, filename: str):
+        """Called before a data file is parsed"""
+
+    def _on_file_complete(self, result: Dict[str, Any]):
+        """Called after a data file has been inserted successfully"""
+
+    def _on_migration_start(self, total_files: int):
+        """Called once before the first file is processed"""
+
+    def _on_migration_error(self, message: str):
+        """Called when the file loop is interrupted"""
+
+    def _record_batch_stat(self, batch_stat: Dict[str, Any]):
+        """Keep a batch stat in memory and hand it to the subclass hook"""
+        self.batch_performance_stats.append(batch_stat)
+        if self.auto_batch_size:
+            self._record_probe(batch_stat)
+        self._on_batch_complete(batch_stat)
+
+    def _drain_batch_stats(self, stats_queue: Queue):
+        """Record the stats the writer thread has posted so far on the calling thread"""
+        while not stats_queue.empty():
+            self._record_batch_stat(stats_queue.get())
+
+    def _next_batch_size(self, table_name: str) -> Tuple[int, bool]:
+        """Size of the next batch and whether it probes an untried AUTO_BATCH_SIZES candidate"""
+        if not self.auto_batch_size:
+            return self.batch_size, False
+
+        issued = self._probes_issued.setdefault(table_name, set())
+        for size in self.AUTO_BATCH_SIZES:
+            if size not in issued:
+                return size, True
+
+        return self.tuned_batch_sizes.get(table_name, self.batch_size), False
+
+    def _record_probe(self, batch_stat: Dict[str, Any]):
+        """Keep the throughput of a finished probe batch and pick the table's batch size once all are in"""
+        table_name = batch_stat["table_name"]
+        size = self._probe_batches.pop((table_name, batch_stat["batch_number"]), None)
+        if size is None:
+            return
+
+        rates = self._probe_rates.setdefault(table_name, {})
+        rates[size] = batch_stat["records_per_second"]
+
+        if len(rates) == len(self.AUTO_BATCH_SIZES):
+            best = max(rates, key=rates.get)
+            self.tuned_batch_sizes[table_name] = best
+            self.logger.info(f"Auto batch size for {table_name}: {best} "
+                             f"({', '.join(f'{s}: {r:.1f} rec/s' for s, r in sorted(rates.items()))})")
+
+    def get_table_name_from_filename(self, filename: str) -> Optional[str]:
+        """Extract table name from filename"""
+        match = self._prefix_re.match(filename)
+        if match:
+            return self._prefix_tables[match.group(0)]
+        self.logger.warning(f"Unknown file pattern: {filename}")
+        return None
+
+    def get_table_columns(self, table_name: str) -> List[str]:
+        """Get column names for a table (excluding auto-generated columns)"""
+        cached = self._col_cache.get(table_name)
+        if cached is not None:
+            return cached
+
+        try:
+            cur = self.cur
+            cur.execute("""
+                SELECT column_name
+                FROM information_schema.columns
+                WHERE table_name = %s
+                AND column_name NOT IN ('createdAt', 'updatedAt', 'id')
+                ORDER BY ordinal_position;
+            """, (table_name,))
+
+            columns = [row[0] for row in cur.fetchall()]
+            self.logger.debug(f"Columns for {table_name}: {columns}")
+            if columns:
+                self._col_cache[table_name] = columns
+            return columns
+        except Exception as e:
+            self._report_error(f"Failed to get columns for {table_name}: {e}")
+            return []
+
+    def _warm_column_cache(self, tables: List[str]):
+        """Load the column lists of several tables in one round trip"""
+        missing = [table for table in tables if table not in self._col_cache]
+        if not missing:
+            return
+
+        try:
+            self.cur.execute("""
+                SELECT table_name, array_agg(column_name::text ORDER BY ordinal_position)
+                FROM information_schema.columns
+                WHERE table_name = ANY(%s)
+                AND column_name NOT IN ('createdAt', 'updatedAt', 'id')
+                GROUP BY table_name;
+            """, (missing,))
+            self._col_cache.update(self.cur.fetchall())
+            self.conn.commit()
+        except Exception as e:
+            # get_table_columns still looks up each table on its own
+            self.conn.rollback()
+            self.logger.warning(f"Failed to preload table columns: {e}")
+
+    def _disable_indexes(self, table_name: str):
+        """Drop secondary indexes on a table, keeping their DDL for rebuild"""
+        # Indexes backing a constraint (primary key, unique, exclusion, referenced by a
+        # foreign key) cannot be dropped on their own and keep enforcing it during the load
+        self.cur.execute("""
+            SELECT schemaname, indexname, indexdef
+            FROM pg_indexes
+            WHERE tablename = %s
+            AND schemaname = current_schema()
+            AND NOT EXISTS (
+                SELECT 1 FROM pg_constraint
+                WHERE conindid = format('%%I.%%I', schemaname, indexname)::regclass
+            )
+        """, (table_name,))
+        indexes = self.cur.fetchall()
+
+        for schema_name, index_name, index_def in indexes:
+            # Logged so the index can be recreated by hand if the run dies before the rebuild
+            self.logger.info(f"Dropping index for bulk load: {index_def}")
+            self.cur.execute(f'DROP INDEX "{schema_name}"."{index_name}"')
+        self.conn.commit()
+
+        self._dropped_indexes[table_name] = [indexdef for _, _, indexdef in indexes]
+        self.logger.info(f"Dropped {len(indexes)} indexes on {table_name} for bulk load")
+
+    def _rebuild_indexes(self, table_name: str):
+        """Recreate indexes dropped by _disable_indexes"""
+        index_defs = self._dropped_indexes.pop(table_name, [])
+        if not index_defs:
+            return
+
+        rebuild_start = time.perf_counter()
+        # Bulk index builds sort in maintenance_work_mem; raise it for this transaction only
+        self.cur.execute("SET LOCAL maintenance_work_mem = %s", (self.INDEX_REBUILD_MAINTENANCE_WORK_MEM,))
+        for index_def in index_defs:
+            self.cur.execute(index_def)
+        self.conn.commit()
+        self.logger.info(f"Rebuilt {len(index_defs)} indexes on {table_name} in {time.perf_counter() - rebuild_start:.2f}s")
+
+    def _set_table_logged(self, table_name: str, logged: bool):
+        """Switch a table between LOGGED and UNLOGGED"""
+        mode = "LOGGED" if logged else "UNLOGGED"
+        self.cur.execute(f"ALTER TABLE {table_name} SET {mode}")
+        self.conn.commit()
+        self.logger.info(f"Set {table_name} {mode}")
+
+    def _install_id_trigger(self, table_name: str):
+        """Install a sequence and BEFORE INSERT trigger that fill in the composite id"""
+        self.cur.execute(f"""
+            CREATE SEQUENCE IF NOT EXISTS {table_name}_id_seq;
+
+            CREATE OR REPLACE FUNCTION {table_name}_set_id() RETURNS trigger AS $$
+            BEGIN
+                IF NEW.id IS NULL THEN
+                    NEW.id := COALESCE(NEW."bidNtceNo", 'None') || '_' ||
+                              COALESCE(NEW."bidNtceOrd", 'None') || '_' ||
+                              nextval('{table_name}_id_seq');
+                END IF;
+                RETURN NEW;
+            END;
+            $$ LANGUAGE plpgsql;
+
+            DROP TRIGGER IF EXISTS {table_name}_set_id ON {table_name};
+            CREATE TRIGGER {table_name}_set_id BEFORE INSERT ON {table_name}
+                FOR EACH ROW EXECUTE FUNCTION {table_name}_set_id();
+        """)
+        self.conn.commit()
+        self.logger.info(f"Installed server-side id trigger on {table_name}")
+
+    def _uses_staging(self, table_name: str) -> bool:
+        """Whether batches for this table go to its staging table"""
+        return table_name in self.COMPOSITE_ID_TABLES and self.staging and not self.server_side_id
+
+    def _uses_client_side_id(self, table_name: str) -> bool:
+        """Whether rows for this table need the composite id built in Python"""
+        return table_name in self.COMPOSITE_ID_TABLES and not self.server_side_id and not self.staging
+
+    def _staging_table(self, table_name: str) -> str:
+        """Name of the UNLOGGED staging table for a target table"""
+        return f"stg_{table_name}"
+
+    def _load_table(self, table_name: str) -> str:
+        """Table that batches are written to"""
+        return self._staging_table(table_name) if self._uses_staging(table_name) else table_name
+
+    def _lead_column(self, table_name: str) -> Optional[str]:
+        """Column sent ahead of the data columns: the client-side id or the staging row number"""
+        if self._uses_client_side_id(table_name):
+            return "id"
+        if self._uses_staging(table_name):
+            return "_row"
+        return None
+
+    def _create_staging_table(self, table_name: str):
+        """Create an empty UNLOGGED copy of a table, with a row number column in place of the id"""
+        staging_table = self._staging_table(table_name)
+        self.cur.execute(f"""
+            DROP TABLE IF EXISTS {staging_table};
+            CREATE UNLOGGED TABLE {staging_table} AS SELECT * FROM {table_name} WITH NO DATA;
+            ALTER TABLE {staging_table} DROP COLUMN "id", ADD COLUMN "_row" bigint;
+        """)
+        self.conn.commit()
+        self.logger.info(f"Created staging table {staging_table}")
+
+    def _drop_staging_table(self, table_name: str):
+        """Drop the staging table created for a run"""
+        try:
+            self.cur.execute(f"DROP TABLE IF EXISTS {self._staging_table(table_name)}")
+            self.conn.commit()
+        except Exception as e:
+            self.logger.error(f"Failed to drop staging table for {table_name}: {e}")
+            self.conn.rollback()
+
+    def _truncate_staging_table(self, table_name: str):
+        """Discard rows left in a staging table by a failed file"""
+        self.cur.execute(f"TRUNCATE {self._staging_table(table_name)}")
+        self.conn.commit()
+
+    def _merge_staging_table(self, table_name: str, table_columns: List[str]):
+        """Move staged rows into the target table, building the composite id server-side"""
+        staging_table = self._staging_table(table_name)
+        quoted_columns = ', '.join([f'"{col}"' for col in table_columns])
+
+        # Insert and truncate in one transaction so a file is merged completely or not at all
+        try:
+            self.cur.execute(f"""
+                INSERT INTO {table_name} ("id", {quoted_columns}, "createdAt", "updatedAt")
+                SELECT COALESCE("bidNtceNo", 'None') || '_' || COALESCE("bidNtceOrd", 'None') || '_' || "_row",
+                       {quoted_columns}, "createdAt", "updatedAt"
+                FROM {staging_table};
+                TRUNCATE {staging_table};
+            """)
+            self.conn.commit()
+        except Exception:
+            self.conn.rollback()
+            raise
+        self.logger.info(f"Merged {staging_table} into {table_name}")
+
+    def _insert_parts(self, table_name: str, table_columns: List[str]):
+        """Quoted column list and matching row placeholders, with or without the lead id/row number column"""
+        # Quote column names to preserve case sensitivity
+        quoted_columns = ', '.join([f'"{col}"' for col in table_columns])
+        placeholders = ', '.join(['%s'] * len(table_columns))
+
+        lead_column = self._lead_column(table_name)
+        if lead_column:
+            quoted_columns = f'"{lead_column}", ' + quoted_columns
+            placeholders = '%s, ' + placeholders
+
+        # Add timestamp columns
+        quoted_columns += ', "createdAt", "updatedAt"'
+        placeholders += ', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP'
+
+        return quoted_columns, placeholders
+
+    def _build_insert_sql(self, table_name: str, table_columns: List[str]) -> str:
+        """Build the single-row INSERT statement used with executemany"""
+        quoted_columns, placeholders = self._insert_parts(table_name, table_columns)
+        return f"INSERT INTO {self._load_table(table_name)} ({quoted_columns}) VALUES ({placeholders})"
+
+    def _build_values_sql(self, table_name: str, table_columns: List[str]):
+        """Build the execute_values statement and its per-row template"""
+        quoted_columns, placeholders = self._insert_parts(table_name, table_columns)
+        return f"INSERT INTO {self._load_table(table_name)} ({quoted_columns}) VALUES %s", f"({placeholders})"
+
+    def _copy_columns(self, table_name: str, table_columns: List[str]) -> List[str]:
+        """Columns carried in each COPY row, before the two timestamp columns"""
+        lead_column = self._lead_column(table_name)
+        if lead_column:
+            return [lead_column] + table_columns
+        return table_columns
+
+    def _build_copy_sql(self, table_name: str, table_columns: List[str]) -> str:
+        """Build the COPY FROM STDIN statement for a table"""
+        quoted_columns = ', '.join([f'"{col}"' for col in self._copy_columns(table_name, table_columns)])
+        return f'COPY {self._load_table(table_name)} ({quoted_columns}, "createdAt", "updatedAt") FROM STDIN'
+
+    def _get_table_sql(self, table_name: str, table_columns: List[str]) -> TableSQL:
+        """Return the cached statements for a table, building them on first use"""
+        table_sql = self._sql_cache.get(table_name)
+        if table_sql is None:
+            values_sql, values_template = self._build_values_sql(table_name, table_columns)
+            table_sql = TableSQL(
+                insert_sql=self._build_insert_sql(table_name, table_columns),
+                values_sql=values_sql,
+                values_template=values_template,
+                copy_sql=self._build_copy_sql(table_name, table_columns),
+                id_source_indexes=(
+                    (table_columns.index('bidNtceNo'), table_columns.index('bidNtceOrd'))
+                    if self._uses_client_side_id(table_name) else None
+                ),
+                number_rows=self._uses_staging(table_name)
+            )
+            self._sql_cache[table_name] = table_sql
+        return table_sql
+
+    def _serialize_copy_rows(self, batch_data: List[tuple]) -> io.BytesIO:
+        """Serialize prepared rows into a COPY text-format buffer"""
+        # Encoded once up front; BytesIO reads the bytes in place and psycopg2 sends them as-is
+        return io.BytesIO(_copy_payload(batch_data, self.session_tz).encode())
+
+    def _write_batch(self, conn, cur, table_name: str, table_sql: TableSQL,
+                     batch_data: List[tuple], copy_buffer: Optional[io.BytesIO],
+                     in_transaction: bool = False):
+        """Send one prepared batch with the configured insert method (without committing)"""
+        if copy_buffer is not None:
+            # Earlier uncommitted batches must survive a failed COPY, so roll back to a savepoint
+            if in_transaction:
+                cur.execute("SAVEPOINT copy_batch")
+            try:
+                cur.copy_expert(table_sql.copy_sql, copy_buffer)
+                if in_transaction:
+                    cur.execute("RELEASE SAVEPOINT copy_batch")
+                return
+            except psycopg2.Error as e:
+                self.logger.warning(f"COPY into {table_name} failed, retrying batch with executemany: {e}")
+                if in_transaction:
+                    cur.execute("ROLLBACK TO SAVEPOINT copy_batch")
+                    cur.execute("RELEASE SAVEPOINT copy_batch")
+                else:
+                    conn.rollback()
+        elif self.insert_method == "values":
+            psycopg2.extras.execute_values(cur, table_sql.values_sql, batch_data,
+                                           template=table_sql.values_template, page_size=len(batch_data))
+            return
+        elif self.insert_method == "batch":
+            psycopg2.extras.execute_batch(cur, table_sql.insert_sql, batch_data, page_size=len(batch_data))
+            return
+
+        cur.executemany(table_sql.insert_sql, batch_data)
+
+    def begin_bulk_load(self, tables: List[str]):
+        """Prepare tables for bulk load according to the configured options"""
+        for table in tables:
+            if self.drop_indexes:
+                self._disable_indexes(table)
+            if self.unlogged:
+                self._set_table_logged(table, logged=False)
+
+    def end_bulk_load(self, tables: List[str]):
+        """Restore tables prepared by begin_bulk_load"""
+        for table in tables:
+            try:
+                if self.unlogged:
+                    self._set_table_logged(table, logged=True)
+                if self.drop_indexes:
+                    self._rebuild_indexes(table)
+            except Exception as e:
+                self.logger.error(f"Failed to restore {table} after bulk load: {e}")
+                self.conn.rollback()
+
+    def _prepare_batch(self, table_sql: TableSQL, table_columns: List[str],
+                       batch: List[Dict[str, Any]], start_offset: int) -> List[tuple]:
+        """Prepare a batch as tuples in COPY/INSERT column order on the calling thread"""
+        return _prepare_rows(batch, table_columns, table_sql.id_source_indexes, start_offset, table_sql.number_rows)
+
+    def _prepare_batch_payload(self, table_sql: TableSQL, table_columns: List[str],
+                               batch: List[Dict[str, Any]], start_offset: int):
+        """Prepare rows and the COPY buffer for a batch, in a worker process when configured"""
+        with_copy = self.insert_method == "copy"
+        if self._prepare_pool is not None:
+            batch_data, payload = self._prepare_pool.submit(
+                _prepare_batch_payload, batch, table_columns, table_sql.id_source_indexes, start_offset,
+                table_sql.number_rows, with_copy, self.session_tz
+            ).result()
+            return batch_data, (io.BytesIO(payload) if payload is not None else None)
+
+        batch_data = self._prepare_batch(table_sql, table_columns, batch, start_offset)
+        copy_buffer = self._serialize_copy_rows(batch_data) if with_copy and batch_data else None
+        return batch_data, copy_buffer
+
+    def _insert_batch_worker(self, table_name: str, table_columns: List[str],
+                            batch_records: List[Dict[str, Any]], batch_number: int,
+                            start_offset: int, worker_conns: Dict[int, Any]) -> Dict[str, Any]:
+        """Worker function to insert a single batch on the worker thread's pooled connection"""
+        batch_start_time = time.time()
+        # Durations use the monotonic perf_counter; the wall clock only stamps start/end
+        batch_start = time.perf_counter()
+
+        # Initialize variables for error logging
+        conn = None
+        insert_sql = None
+        batch_data = []
+
+        try:
+            # Each worker thread keeps one connection for the whole file instead of a checkout per batch
+            conn = self._worker_connection(worker_conns)
+            cur = conn.cursor()
+
+            # Data preparation phase
+            data_prep_start = time.perf_counter()
+            table_sql = self._get_table_sql(table_name, table_columns)
+            batch_data, copy_buffer = self._prepare_batch_payload(table_sql, table_columns, batch_records, start_offset)
+
+            if batch_data:
+                if self.insert_method == "copy":
+                    insert_sql = table_sql.copy_sql
+                elif self.insert_method == "values":
+                    insert_sql = table_sql.values_sql
+                else:
+                    insert_sql = table_sql.insert_sql
+
+                data_prep_end = time.perf_counter()
+                data_preparation_time = data_prep_end - data_prep_start
+
+                # Execute batch (query execution phase)
+                query_exec_start = time.perf_counter()
+                self._write_batch(conn, cur, table_name, table_sql, batch_data, copy_buffer)
+                query_exec_end = time.perf_counter()
+                query_execution_time = query_exec_end - query_exec_start
+
+                # Commit phase
+                commit_start = time.perf_counter()
+                conn.commit()
+                commit_end = time.perf_counter()
+                commit_time = commit_end - commit_start
+
+            cur.close()
+            batch_end = time.perf_counter()
+
+            # Calculate performance metrics
+            batch_duration = batch_end - batch_start
+            records_per_second = len(batch_data) / batch_duration if batch_duration > 0 else 0
+            network_db_time = query_execution_time + commit_time
+            overhead_time = batch_duration - data_preparation_time - network_db_time
+
+            return {
+                "success": True,
+                "batch_number": batch_number,
+                "table_name": table_name,
+                "records_count": len(batch_data),
+                "start_time": batch_start_time,
+                "end_time": batch_start_time + batch_duration,
+                "total_duration_seconds": batch_duration,
+                "data_preparation_time": data_preparation_time,
+                "query_execution_time": query_execution_time,
+                "commit_time": commit_time,
+                "network_db_time": network_db_time,
+                "overhead_time": overhead_time,
+                "records_per_second": records_per_second
+            }
+
+        except Exception as e:
+            self.logger.error(f"Failed to insert batch {batch_number} into {table_name}: {e}")
+
+            # Log failed SQL and sample data for debugging
+            if insert_sql:
+                self.logger.error(f"Failed SQL: {insert_sql}")
+            if batch_data:
+                self.logger.error(f"Sample failed data (first record): {batch_data[0]}")
+                self.logger.error(f"Total records in failed batch: {len(batch_data)}")
+
+            if conn and not conn.closed:
+                conn.rollback()
+            return {
+                "success": False,
+                "batch_number": batch_number,
+                "error": str(e)
+            }
+
+    def _iter_batches(self, table_name: str, records: Iterable[Dict[str, Any]], batch_size: int):
+        """Yield (batch, batch_number, start_offset) chunks, trimmed to the max_records limit"""
+        # Counts records handed out, so the limit holds even while earlier batches are in flight
+        inserted_before = self.total_records_inserted
+        records_planned = 0
+
+        # Batch numbers restart per file; forget probes of an earlier file that never finished
+        for key in [key for key in self._probe_batches if key[0] == table_name]:
+            del self._probe_batches[key]
+
+        # Works for lists and for streams; a streamed file is never materialized as a whole
+        records_iter = iter(records)
+        i = 0
+        batch_number = 0
+        while True:
+            probing = False
+            if self.auto_batch_size:
+                batch_size, probing = self._next_batch_size(table_name)
+            batch = list(islice(records_iter, batch_size))
+            if not batch:
+                return
+            batch_number += 1
+
+            # Check if max_records limit reached
+            if self.max_records and inserted_before + records_planned >= self.max_records:
+                self.max_records_reached = True
+                self.logger.info(f"Maximum record limit ({self.max_records:,}) reached. Stopping batch processing.")
+                return
+
+            # If this batch would exceed max_records, trim it
+            if self.max_records and inserted_before + records_planned + len(batch) > self.max_records:
+                remaining = self.max_records - inserted_before - records_planned
+                batch = batch[:remaining]
+                self.max_records_reached = True
+                self.logger.info(f"Trimming batch to {remaining} records to reach max limit of {self.max_records:,}")
+
+            # Only a full batch counts as a probe; a short last batch is tried again in the next file
+            if probing and len(batch) == batch_size:
+                self._probes_issued[table_name].add(batch_size)
+                self._probe_batches[(table_name, batch_number)] = batch_size
+
+            records_planned += len(batch)
+            yield batch, batch_number, i
+            i += len(batch)
+
+            if self.max_records_reached:
+                return
+
+    def _insert_batch_parallel(self, table_name: str, records: Iterable[Dict[str, Any]],
+                               batch_size: int, table_columns: List[str]) -> int:
+        """Insert records using multiple parallel connections"""
+        total_inserted = 0
+
+        # Batches are sliced and submitted lazily; only this many are queued or running at once
+        max_in_flight = self.num_connections * 2
+        batches = self._iter_batches(table_name, records, batch_size)
+
+        batch_desc = "auto-sized batches" if self.auto_batch_size else f"batches of {batch_size}"
+        self.logger.info(f"Processing {batch_desc} using {self.num_connections} connections")
+
+        # Worker thread id -> the pooled connection it holds; all are returned once the executor is done
+        worker_conns: Dict[int, Any] = {}
+
+        # Process batches in parallel using ThreadPoolExecutor
+        try:
+            with ThreadPoolExecutor(max_workers=self.num_connections) as executor:
+                future_to_batch = {}
+                batches_exhausted = False
+
+                while True:
+                    # Top up the in-flight window - each worker thread uses its own pooled connection
+                    while not batches_exhausted and len(future_to_batch) < max_in_flight:
+                        next_batch = next(batches, None)
+                        if next_batch is None:
+                            batches_exhausted = True
+                            break
+                        batch_records, batch_number, start_offset = next_batch
+                        future = executor.submit(
+                            self._insert_batch_worker,
+                            table_name, table_columns, batch_records, batch_number, start_offset, worker_conns
+                        )
+                        future_to_batch[future] = batch_number
+
+                    if not future_to_batch:
+                        break
+
+                    # Collect results as they complete
+                    done, _ = wait(future_to_batch, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        batch_number = future_to_batch.pop(future)
+                        try:
+                            result = future.result()
+
+                            if result["success"]:
+                                total_inserted += result["records_count"]
+                                self.total_records_inserted += result["records_count"]
+
+                                # Thread-safe stats collection
+                                with self.stats_lock:
+                                    batch_stat = {
+                                        "batch_number": result["batch_number"],
+                                        "table_name": result["table_name"],
+                                        "records_count": result["records_count"],
+                                        "start_time": result["start_time"],
+                                        "end_time": result["end_time"],
+                                        "total_duration_seconds": result["total_duration_seconds"],
+                                        "data_preparation_time": result["data_preparation_time"],
+                                        "query_execution_time": result["query_execution_time"],
+                                        "commit_time": result["commit_time"],
+                                        "network_db_time": result["network_db_time"],
+                                        "overhead_time": result["overhead_time"],
+                                        "records_per_second": result["records_per_second"],
+                                        "cumulative_records": total_inserted
+                                    }
+                                    self._record_batch_stat(batch_stat)
+
+                                # Log progress
+                                self.logger.info(f"Batch {result['batch_number']} for {table_name}: "
+                                                 f"{result['records_count']} records in "
+                                                 f"{result['total_duration_seconds']:.3f}s "
+                                                 f"({result['records_per_second']:.1f} rec/s)")
+                            else:
+                                self.logger.error(f"Batch {batch_number} failed: {result.get('error', 'Unknown error')}")
+
+                        except Exception as e:
+                            self.logger.error(f"Exception processing batch {batch_number}: {e}")
+        finally:
+            for conn in worker_conns.values():
+                self.return_connection(conn, close=bool(conn.closed))
+
+        self.logger.info(f"Total inserted into {table_name}: {total_inserted} records using {self.num_connections} connections")
+        return total_inserted
+
+    def insert_batch(self, table_name: str, records: Iterable[Dict[str, Any]], batch_size: int = None) -> int:
+        """Insert records in batches with performance monitoring and multi-connection support"""
+        if not records:
+            return 0
+
+        # Use instance batch_size if not provided
+        if batch_size is None:
+            batch_size = self.batch_size
+
+        table_columns = self.get_table_columns(table_name)
+        if not table_columns:
+            self._report_error(f"No columns found for table {table_name}")
+            return 0
+
+        # Use multi-connection if configured
+        if self.num_connections > 1:
+            try:
+                return self._insert_batch_parallel(table_name, records, batch_size, table_columns)
+            finally:
+                self._on_insert_complete()
+
+        # Single connection: prepare batches here while a writer thread executes them
+        table_sql = self._get_table_sql(table_name, table_columns)
+        write_queue = Queue(maxsize=self.WRITE_QUEUE_SIZE)
+        # Finished batch stats come back here so the hooks run on this thread, not the writer's
+        stats_queue = Queue()
+        writer_state = {"total_inserted": 0, "error": None}
+        writer = Thread(
+            target=self._writer_loop,
+            args=(table_name, table_sql, write_queue, stats_queue, writer_state),
+            name=f"writer-{table_name}",
+            daemon=True
+        )
+        writer.start()
+
+        try:
+            for batch, batch_number, i in self._iter_batches(table_name, records, batch_size):
+                self._drain_batch_stats(stats_queue)
+                # Stop producing once the writer has failed
+                if writer_state["error"] is not None:
+                    break
+
+                # Data preparation phase
+                data_prep_start = time.perf_counter()
+                # COPY serialization is preparation work, so it stays off the writer thread
+                batch_data, copy_buffer = self._prepare_batch_payload(table_sql, table_columns, batch, i)
+
+                if batch_data:
+                    data_preparation_time = time.perf_counter() - data_prep_start
+
+                    # Blocks while WRITE_QUEUE_SIZE batches are already waiting (backpressure)
+                    write_queue.put((batch_number, batch_data, copy_buffer, data_preparation_time))
+        finally:
+            # Let the writer drain the queue, then notify at the file boundary
+            write_queue.put(None)
+            writer.join()
+            self._drain_batch_stats(stats_queue)
+            self._on_insert_complete()
+
+        if writer_state["error"] is not None:
+            self._report_error(f"Failed to insert batch into {table_name}: {writer_state['error']}")
+            raise writer_state["error"]
+
+        total_inserted = writer_state["total_inserted"]
+        self.logger.info(f"Total inserted into {table_name}: {total_inserted} records")
+
+        return total_inserted
+
+    def _writer_loop(self, table_name: str, table_sql: TableSQL, write_queue: Queue, stats_queue: Queue,
+                     writer_state: Dict[str, Any]):
+        """Execute prepared batches on the main connection until the None sentinel arrives"""
+        # Batches written since the last commit; 0 = commit once per file
+        pending_batches = 0
+        uncommitted_records = 0
+
+        while True:
+            item = write_queue.get()
+            if item is None:
+                break
+
+            # After a failure keep draining so the producer never blocks on a full queue
+            if writer_state["error"] is not None:
+                continue
+
+            batch_number, batch_data, copy_buffer, data_preparation_time = item
+
+            try:
+                # Execute batch (query execution phase)
+                query_exec_start = time.perf_counter()
+                self._write_batch(self.conn, self.cur, table_name, table_sql, batch_data, copy_buffer,
+                                  in_transaction=pending_batches > 0)
+                query_exec_end = time.perf_counter()
+                query_execution_time = query_exec_end - query_exec_start
+
+                # Commit phase, only every commit_every batches
+                pending_batches += 1
+                commit_time = 0.0
+                if self.commit_every and pending_batches >= self.commit_every:
+                    commit_start = time.perf_counter()
+                    self.conn.commit()
+                    commit_end = time.perf_counter()
+                    commit_time = commit_end - commit_start
+                    pending_batches = 0
+            except Exception as e:
+                self.conn.rollback()
+                writer_state["error"] = e
+                # Rows of earlier batches in the rolled back transaction were never committed
+                writer_state["total_inserted"] -= uncommitted_records
+                self.total_records_inserted -= uncommitted_records
+                continue
+
+            uncommitted_records = uncommitted_records + len(batch_data) if pending_batches else 0
+            writer_state["total_inserted"] += len(batch_data)
+            self.total_records_inserted += len(batch_data)
+            batch_end = time.perf_counter()
+
+            # Batch duration covers this batch's own work (preparation + DB), not its wait in the queue
+            batch_duration = data_preparation_time + (batch_end - query_exec_start)
+            batch_end_time = time.time()
+            batch_start_time = batch_end_time - batch_duration
+            records_per_second = len(batch_data) / batch_duration if batch_duration > 0 else 0
+            network_db_time = query_execution_time + commit_time
+            overhead_time = batch_duration - data_preparation_time - network_db_time
+
+            # Store batch performance stats
+            batch_stat = {
+                "batch_number": batch_number,
+                "table_name": table_name,
+                "records_count": len(batch_data),
+                "start_time": batch_start_time,
+                "end_time": batch_end_time,
+                "total_duration_seconds": batch_duration,
+                "data_preparation_time": data_preparation_time,
+                "query_execution_time": query_execution_time,
+                "commit_time": commit_time,
+                "network_db_time": network_db_time,
+                "overhead_time": overhead_time,
+                "records_per_second": records_per_second,
+                "cumulative_records": writer_state["total_inserted"]
+            }
+            stats_queue.put(batch_stat)
+
+            # Log progress
+            self.logger.info(f"Batch {batch_number} for {table_name}: {len(batch_data)} records in {batch_duration:.3f}s ({records_per_second:.1f} rec/s)")
+
+        # Commit whatever is left of the file
+        if pending_batches and writer_state["error"] is None:
+            try:
+                self.conn.commit()
+            except Exception as e:
+                self.conn.rollback()
+                writer_state["error"] = e
+                writer_state["total_inserted"] -= uncommitted_records
+                self.total_records_inserted -= uncommitted_records
+
+    def _should_stream(self, file_path: Path) -> bool:
+        """Whether a file is large enough to stream and starts with a top-level array"""
+        if file_path.stat().st_size < self.STREAM_THRESHOLD_BYTES:
+            return False
+        # Anything else goes through the typed decoder so it is reported as invalid data format
+        with open(file_path, 'rb') as f:
+            return f.read(1024).lstrip(b'\xef\xbb\xbf \t\r\n').startswith(b'[')
+
+    def process_file(self, file_path: Path) -> Dict[str, Any]:
+        """Process a single JSON file"""
+        filename = file_path.name
+        table_name = self.get_table_name_from_filename(filename)
+
+        if not table_name:
+            return {"filename": filename, "status": "skipped", "reason": "unknown file pattern"}
+
+        try:
+            self.logger.info(f"Processing {filename} -> {table_name}")
+            self._on_file_start(filename)
+
+            staged = self._uses_staging(table_name)
+            if staged:
+                self._truncate_staging_table(table_name)
+
+            if self._should_stream(file_path):
+                # Large top-level array: parse and insert batch by batch
+                with open(file_path, 'rb') as f:
+                    records = _CountingIterator(IJSON.items(f, 'item', use_float=True))
+                    inserted_count = self.insert_batch(table_name, records)
+                records_processed = records.count
+            else:
+                # Read and parse JSON file
+                try:
+                    data = _decode_records(file_path)
+                except msgspec.ValidationError as e:
+                    self.logger.warning(f"Expected list of records in {filename}: {e}")
+                    return {"filename": filename, "status": "error", "reason": "invalid data format"}
+
+                # Insert data
+                inserted_count = self.insert_batch(table_name, data)
+                records_processed = len(data)
+
+            if staged:
+                self._merge_staging_table(table_name, self.get_table_columns(table_name))
+
+            result = {
+                "filename": filename,
+                "table": table_name,
+                "status": "success",
+                "records_processed": records_processed,
+                "records_inserted": inserted_count
+            }
+
+            self._on_file_complete(result)
+
+            return result
+
+        except Exception as e:
+            self.logger.error(f"Failed to process {filename}: {e}")
+            return {
+                "filename": filename,
+                "table": table_name,
+                "status": "error",
+                "reason": str(e)
+            }
+
+    def migrate_all_files(self, data_dir: str = "data") -> List[Dict[str, Any]]:
+        """Process all JSON files in the data directory"""
+        data_path = Path(data_dir)
+
+        if not data_path.exists():
+            raise FileNotFoundError(f"Data directory {data_dir} not found")
+
+        # Get all JSON files except sample_data.json, largest first (ties in filename order)
+        file_sizes = {
+            f: f.stat().st_size
+            for f in data_path.iterdir() if f.suffix == ".json" and f.name != "sample_data.json"
+        }
+        json_files = sorted(file_sizes, key=lambda f: (-file_sizes[f], f.name))
+
+        if not json_files:
+            self.logger.warning("No JSON files found to process")
+            return []
+
+        self.logger.info(f"Found {len(json_files)} files to process")
+
+        # Start migration
+        self._on_migration_start(len(json_files))
+
+        results = []
+
+        # Tables touched by this run, prepared once for the whole migration
+        run_tables = sorted({
+            table for table in map(self.get_table_name_from_filename, (f.name for f in json_files)) if table
+        })
+        self._warm_column_cache(run_tables)
+
+        if self.server_side_id:
+            for table in run_tables:
+                if table in self.COMPOSITE_ID_TABLES:
+                    self._install_id_trigger(table)
+
+        staged_tables = [table for table in run_tables if self._uses_staging(table)]
+        for table in staged_tables:
+            self._create_staging_table(table)
+
+        bulk_load_tables = []
+        if self.drop_indexes or self.unlogged:
+            bulk_load_tables = run_tables
+            self.begin_bulk_load(bulk_load_tables)
+
+        try:
+            self._migrate_files(json_files, results)
+        finally:
+            self.end_bulk_load(bulk_load_tables)
+            for table in staged_tables:
+                self._drop_staging_table(table)
+
+        return results
+
+    def _migrate_files(self, json_files: List[Path], results: List[Dict[str, Any]]):
+        """Process files in order, appending each file result to results"""
+        for file_path in json_files:
+            try:
+                result = self.process_file(file_path)
+                results.append(result)
+
+                # Log progress
+                if result["status"] == "success":
+                    self.logger.info(f"✓ {result['filename']}: {result['records_inserted']} records inserted")
+                else:
+                    self.logger.warning(f"✗ {result['filename']}: {result.get('reason', 'unknown error')}")
+
+                # Check if max_records limit reached
+                if self.max_records_reached:
+                    self.logger.info(f"Maximum record limit ({self.max_records:,}) reached. Stopping migration.")
+                    self.logger.info(f"Total records inserted: {self.total_records_inserted:,}")
+                    break
+
+            except KeyboardInterrupt:
+                self.logger.info("Migration interrupted by user")
+                self._on_migration_error("Interrupted by user")
+                break
+            except Exception as e:
+                self.logger.error(f"Unexpected error processing {file_path.name}: {e}")
+                results.append({
+                    "filename": file_path.name,
+                    "status": "error",
+                    "reason": str(e)
+                })
+
+    def print_summary(self, results: List[Dict[str, Any]]):
+        """Print migration summary"""
+        # Split by status and total the inserted records in one pass
+        successful, failed, skipped = [], [], []
+        total_records = 0
+        for r in results:
+            if r["status"] == "success":
+                successful.append(r)
+                total_records += r.get("records_inserted", 0)
+            elif r["status"] == "error":
+                failed.append(r)
+            elif r["status"] == "skipped":
+                skipped.append(r)
+
+        print("\n" + "="*60)
+        print("MIGRATION SUMMARY")
+        print("="*60)
+        print(f"Total files processed: {len(results)}")
+        print(f"Successful: {len(successful)}")
+        print(f"Failed: {len(failed)}")
+        print(f"Skipped: {len(skipped)}")
+        print(f"Total records inserted: {total_records:,}")
+
+        if self.max_records:
+            print(f"Maximum records limit: {self.max_records:,}")
+            if self.max_records_reached:
+                print("⚠️  LIMIT REACHED: Migration stopped due to max_records limit")
+
+        if successful:
+            print("\n✓ SUCCESSFUL FILES:")
+            for result in successful:
+                print(f"  {result['filename']} -> {result['table']}: {result['records_inserted']:,} records")
+
+        if failed:
+            print("\n✗ FAILED FILES:")
+            for result in failed:
+                print(f"  {result['filename']}: {result['reason']}")
+
+        if skipped:
+            print("\n⚠ SKIPPED FILES:")
+            for result in skipped:
+                print(f"  {result['filename']}: {result['reason']}")
+
+        print("="*60)
+
+    def get_table_counts(self) -> Dict[str, int]:
+        """Get record counts for all tables (planner estimates unless exact_counts is set)"""
+        tables = sorted({table for _, table in self._PREFIX_MAP})
+
+        counts = {}
+        try:
+            if not self.exact_counts:
+                # pg_class.reltuples is read in O(1) instead of scanning every table
+                self.cur.execute("""
+                    SELECT relname, reltuples::bigint
+                    FROM pg_class
+                    WHERE relname = ANY(%s)
+                    AND relnamespace = current_schema()::regnamespace
+                """, (tables,))
+                # Tables never vacuumed or analyzed report -1 and are counted exactly below
+                counts = {table: count for table, count in self.cur.fetchall() if count >= 0}
+
+            exact_tables = [table for table in tables if table not in counts]
+            if exact_tables:
+                # Single round-trip for all remaining tables
+                count_sql = " UNION ALL ".join(
+                    f"SELECT '{table}' AS table_name, COUNT(*) FROM {table}" for table in exact_tables
+                )
+                self.cur.execute(count_sql)
+                counts.update(self.cur.fetchall())
+
+            counts = {table: counts[table] for table in tables}
+        except Exception as e:
+            self._report_error(f"Failed to get table counts: {e}")
+
+        return counts
+
+    def close(self):
+        """Close database connections and pool"""
+        if self._prepare_pool is not None:
+            self._prepare_pool.shutdown()
+            self._prepare_pool = None
+        if self.cur:
+            self.cur.close()
+            self.cur = None
+        if self.pool:
+            # Return the main connection to the pool first
+            if self.conn:
+                self.pool.putconn(self.conn)
+                self.conn = None
+            # Close all connections in the pool
+            self.pool.closeall()
+            self.logger.info("Database connection pool closed")
@@ -1,8 +1,37 @@
 """
 Migration logging setup
 """
+import atexit
 import logging
+import queue
 from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+
+_listeners = {}
+
+
+def attach_queue_listener(logger: logging.Logger, *handlers: logging.Handler) -> QueueListener:
+    """Route a logger through a queue drained into the handlers by a background thread"""
+    # Replace a listener left over from an earlier setup of the same logger
+    previous = _listeners.pop(logger.name, None)
+    if previous is not None:
+        previous.stop()
+
+    log_queue = queue.Queue(-1)
+    listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _listeners[logger.name] = listener
+
+    logger.addHandler(QueueHandler(log_queue))
+    return listener
+
+
+@atexit.register
+def _stop_listeners():
+    """Drain queued records before the interpreter shuts logging down"""
+    for listener in _listeners.values():
+        listener.stop()
+    _listeners.clear()
 
 
 def setup_migration_logger():
@@ -23,5 +52,6 @@ def setup_migration_logger():
     formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
     file_handler.setFormatter(formatter)
 
-    logger.addHandler(file_handler)
-    return logger, log_filename
\ No newline at end of file
+    # Log calls only enqueue; the file is written by the listener thread
+    attach_queue_listener(logger, file_handler)
+    return logger, log_filename
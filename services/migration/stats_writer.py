@@ -2,13 +2,18 @@
 Stats writer utility for migration progress and statistics
 Thread-safe JSON file operations for migration monitoring
 """
-import json
 import os
 from pathlib import Path
 from typing import Dict, Any, List
 from datetime import datetime
 import threading
 
+import msgspec
+
+# Batch stats are appended one JSON document per line
+_LINE_ENCODER = msgspec.json.Encoder(enc_hook=str)
+_LINE_DECODER = msgspec.json.Decoder()
+
 
 class StatsWriter:
     """Thread-safe writer for migration statistics"""
@@ -21,6 +26,8 @@ class StatsWriter:
         self.progress_file = self.output_dir / "migration_progress.json"
         self.stats_file = self.output_dir / "migration_stats.json"
         self.results_file = self.output_dir / "migration_results.json"
+        # Batch stats of the running migration; folded into stats_file when it ends
+        self.batches_file = self.output_dir / "migration_stats.ndjson"
 
         self.cloud_provider = cloud_provider
         self.instance_type = instance_type
@@ -55,15 +62,17 @@ class StatsWriter:
     def _write_json(self, file_path: Path, data: Dict[str, Any]):
         """Write JSON data to file"""
         with self._lock:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+            # Serialized in C and written with a single call
+            payload = msgspec.json.format(msgspec.json.encode(data, enc_hook=str), indent=2)
+            with open(file_path, 'wb') as f:
+                f.write(payload)
 
     def _read_json(self, file_path: Path) -> Dict[str, Any]:
         """Read JSON data from file"""
         with self._lock:
             if file_path.exists():
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                with open(file_path, 'rb') as f:
+                    return msgspec.json.decode(f.read())
             return {}
 
     def update_progress(self, **kwargs):
@@ -104,14 +113,46 @@ class StatsWriter:
         if self.instance_type:
             stats_data["instance_type"] = self.instance_type
         self._write_json(self.stats_file, stats_data)
+        with self._lock:
+            self.batches_file.write_bytes(b"")
+
+    @staticmethod
+    def _format_batch_stat(batch_stat: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert the raw epoch start/end times of a batch stat to ISO strings"""
+        formatted = dict(batch_stat)
+        for key in ("start_time", "end_time"):
+            if isinstance(formatted.get(key), float):
+                formatted[key] = datetime.fromtimestamp(formatted[key]).isoformat()
+        return formatted
 
     def add_batch_stat(self, batch_stat: Dict[str, Any]):
         """Add a batch statistic"""
-        stats = self._read_json(self.stats_file)
-        if "batches" not in stats:
-            stats["batches"] = []
-        stats["batches"].append(batch_stat)
+        self.add_batch_stats([batch_stat])
+
+    def add_batch_stats(self, batch_stats: List[Dict[str, Any]]):
+        """Append batch statistics to the NDJSON file without rewriting earlier batches"""
+        lines = bytearray()
+        for batch_stat in batch_stats:
+            _LINE_ENCODER.encode_into(self._format_batch_stat(batch_stat), lines, -1)
+            lines += b"\n"
+        with self._lock:
+            with open(self.batches_file, 'ab') as f:
+                f.write(lines)
+
+    def _read_batch_lines(self) -> List[Dict[str, Any]]:
+        """Read the batch stats appended since the migration started"""
+        with self._lock:
+            if self.batches_file.exists():
+                return _LINE_DECODER.decode_lines(self.batches_file.read_bytes())
+            return []
+
+    def _compact_stats(self):
+        """Fold the appended batch stats into the stats JSON file and drop the NDJSON file"""
+        stats = self.read_stats()
         self._write_json(self.stats_file, stats)
+        with self._lock:
+            if self.batches_file.exists():
+                self.batches_file.unlink()
 
     def complete_file(self, file_result: Dict[str, Any]):
         """Mark a file as completed"""
@@ -128,6 +169,7 @@ class StatsWriter:
         progress['status'] = 'completed'
         progress['last_update'] = datetime.now().isoformat()
         self._write_json(self.progress_file, progress)
+        self._compact_stats()
 
         # Save final results with cloud metadata and configuration
         results['completion_time'] = datetime.now().isoformat()
@@ -146,14 +188,17 @@ class StatsWriter:
         progress['error_message'] = error_message
         progress['last_update'] = datetime.now().isoformat()
         self._write_json(self.progress_file, progress)
+        self._compact_stats()
 
     def read_progress(self) -> Dict[str, Any]:
         """Read current progress"""
         return self._read_json(self.progress_file)
 
     def read_stats(self) -> Dict[str, Any]:
-        """Read batch statistics"""
-        return self._read_json(self.stats_file)
+        """Read batch statistics, including batches not yet folded into the stats file"""
+        stats = self._read_json(self.stats_file)
+        stats["batches"] = stats.get("batches", []) + self._read_batch_lines()
+        return stats
 
     def read_results(self) -> Dict[str, Any]:
         """Read final results"""
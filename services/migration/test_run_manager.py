@@ -2,7 +2,6 @@
 Test Run Manager for managing multiple migration test executions
 Handles test metadata, indexing, and comparison across different configurations
 """
-import json
 import os
 from pathlib import Path
 from typing import Dict, Any, List, Optional
@@ -10,6 +9,8 @@ from datetime import datetime
 from dataclasses import dataclass, asdict
 import threading
 
+import msgspec
+
 
 @dataclass
 class TestRun:
@@ -43,7 +44,12 @@ class TestRunManager:
         self.runs_dir.mkdir(exist_ok=True)
 
         self.index_file = self.base_output_dir / "test_runs_index.json"
-        self._lock = threading.Lock()
+        # Reentrant so a read-modify-write of the runs can hold it across the index I/O helpers
+        self._lock = threading.RLock()
+
+        # Runs keyed by test_id, re-read only when the index file changes on disk
+        self._runs: Dict[str, Dict[str, Any]] = {}
+        self._index_stamp = None
 
         # Initialize index file
         self._init_index()
@@ -57,15 +63,42 @@ class TestRunManager:
         """Read test runs index"""
         with self._lock:
             if self.index_file.exists():
-                with open(self.index_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                with open(self.index_file, 'rb') as f:
+                    return msgspec.json.decode(f.read())
             return {"test_runs": []}
 
     def _write_index(self, data: Dict[str, Any]):
         """Write test runs index"""
         with self._lock:
-            with open(self.index_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+            payload = msgspec.json.format(msgspec.json.encode(data, enc_hook=str), indent=2)
+            with open(self.index_file, 'wb') as f:
+                f.write(payload)
+
+    def _index_file_stamp(self) -> Optional[tuple]:
+        """Modification time and size identifying the index file version on disk"""
+        try:
+            stat = self.index_file.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _load_runs(self) -> Dict[str, Dict[str, Any]]:
+        """Return the cached runs, reloading them if another process rewrote the index
+
+        Callers that modify the returned runs must hold _lock until they have called _save_runs.
+        """
+        with self._lock:
+            stamp = self._index_file_stamp()
+            if stamp is None or stamp != self._index_stamp:
+                self._runs = {run["test_id"]: run for run in self._read_index().get("test_runs", [])}
+                self._index_stamp = stamp
+            return self._runs
+
+    def _save_runs(self):
+        """Write the cached runs back to the index file"""
+        with self._lock:
+            self._write_index({"test_runs": list(self._runs.values())})
+            self._index_stamp = self._index_file_stamp()
 
     def generate_test_id(self, cloud_provider: str, instance_type: str,
                         batch_size: int, num_connections: int) -> str:
@@ -100,22 +133,19 @@ class TestRunManager:
         )
 
         # Add to index
-        index_data = self._read_index()
-        index_data["test_runs"].append(test_run.to_dict())
-        self._write_index(index_data)
+        with self._lock:
+            self._load_runs()[test_id] = test_run.to_dict()
+            self._save_runs()
 
         return test_run
 
     def update_test_run(self, test_id: str, **updates):
         """Update test run metadata"""
-        index_data = self._read_index()
-
-        for test_run in index_data["test_runs"]:
-            if test_run["test_id"] == test_id:
+        with self._lock:
+            test_run = self._load_runs().get(test_id)
+            if test_run is not None:
                 test_run.update(updates)
-                break
-
-        self._write_index(index_data)
+                self._save_runs()
 
     def complete_test_run(self, test_id: str, total_records: int,
                          total_duration_seconds: float,
@@ -138,17 +168,15 @@ class TestRunManager:
         )
 
     def get_test_run(self, test_id: str) -> Optional[Dict[str, Any]]:
-        """Get specific test run by ID"""
-        index_data = self._read_index()
-        for test_run in index_data["test_runs"]:
-            if test_run["test_id"] == test_id:
-                return test_run
-        return None
+        """Get a copy of a specific test run by ID; change runs through update_test_run"""
+        with self._lock:
+            test_run = self._load_runs().get(test_id)
+            return dict(test_run) if test_run is not None else None
 
     def get_all_test_runs(self) -> List[Dict[str, Any]]:
-        """Get all test runs"""
-        index_data = self._read_index()
-        return index_data.get("test_runs", [])
+        """Get copies of all test runs; change runs through update_test_run"""
+        with self._lock:
+            return [dict(run) for run in self._load_runs().values()]
 
     def get_test_runs_by_status(self, status: str) -> List[Dict[str, Any]]:
         """Get test runs by status"""
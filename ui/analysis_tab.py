@@ -2,14 +2,128 @@
 Detailed analysis tab component
 """
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
-import json
+import msgspec
 import os
 from datetime import datetime
 from pathlib import Path
-from services.migration.test_run_manager import TestRunManager
+from typing import Dict
+from utils.session_state import get_test_run_manager
+from utils.downsample import MAX_CHART_POINTS, downsample_frame
+
+
+@st.cache_data(show_spinner=False)
+def _load_json(path_str: str, mtime: float):
+    """Parse a JSON output file; mtime is part of the cache key so a rewritten file is re-read"""
+    with open(path_str, 'rb') as f:
+        return msgspec.json.decode(f.read())
+
+
+@st.cache_data(show_spinner=False)
+def _file_results_frame(path_str: str, mtime: float) -> pd.DataFrame:
+    """Per-file results of a results file as the displayed table, built once per file version"""
+    df = pd.DataFrame(_load_json(path_str, mtime).get('file_results', []))
+    df = df[['filename', 'table', 'status', 'records_inserted']].set_axis(['파일명', '테이블', '상태', '삽입된 레코드'], axis=1)
+    df['상태'] = df['상태'].map(_FILE_STATUS_LABELS)
+    return df
+
+
+def _stats_frame(batch_stats) -> pd.DataFrame:
+    """Batch stats as a DataFrame with batch_number counted from 1 within each table"""
+    df = pd.DataFrame(batch_stats)
+    if not df.empty:
+        df['batch_number'] = df.groupby('table_name').cumcount() + 1
+    return df
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _load_stats_frame(path_str: str, mtime: float) -> pd.DataFrame:
+    """Batch stats of a saved stats file as a DataFrame shared across reruns; callers must not modify it"""
+    return _stats_frame(_load_json(path_str, mtime).get('batches', []))
+
+
+# Displayed label of each file result status
+_FILE_STATUS_LABELS = {
+    'success': '✅ 성공',
+    'error': '❌ 실패',
+    'skipped': '⚠️ 건너뜀'
+}
+
+# Consecutive batches whose durations must keep rising to flag a slowdown
+DEGRADATION_WINDOW = 3
+# Recent batches fitted for a gradual slowdown, and the rise over them (relative to their mean) that flags it
+DRIFT_WINDOW = 10
+DRIFT_THRESHOLD = 0.2
+
+# Axis label of each per-batch chart metric
+_BATCH_METRIC_LABELS = {
+    'total_duration_seconds': '처리 시간 (초)',
+    'records_per_second': '처리량 (records/sec)',
+    'cumulative_records': '누적 레코드 수'
+}
+
+
+def _split_tables(df_batch_stats: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """Batches of each table, split in one groupby pass"""
+    return dict(tuple(df_batch_stats.groupby('table_name', sort=False)))
+
+
+@st.cache_resource(max_entries=8, show_spinner=False)
+def _load_table_frames(path_str: str, mtime: float) -> Dict[str, pd.DataFrame]:
+    """Per-table batches of a saved stats file, split once per file version; callers must not modify them"""
+    return _split_tables(_load_stats_frame(path_str, mtime))
+
+
+def _batch_chart(table_df: pd.DataFrame, metric: str, title: str, height: int,
+                 facet: bool = False, all_points: bool = False) -> go.Figure:
+    """Chart one batch metric over batch number: an area for cumulative records, a line otherwise
+
+    Unless all_points, tables with more than MAX_CHART_POINTS batches are downsampled with LTTB.
+    With facet, every table gets its own panel of a single figure, two panels per row.
+    """
+    if not all_points:
+        # Long histories are thinned per table to MAX_CHART_POINTS before they are sent to the browser
+        table_df = downsample_frame(table_df, 'batch_number', metric, by='table_name')
+    kwargs = {'title': title, 'labels': {'batch_number': '배치 번호', metric: _BATCH_METRIC_LABELS[metric]}}
+    if facet:
+        kwargs.update(facet_col='table_name', facet_col_wrap=2, facet_row_spacing=0.08)
+        height *= (table_df['table_name'].nunique() + 1) // 2
+    if metric == 'cumulative_records':
+        fig = px.area(table_df, x='batch_number', y=metric, **kwargs)
+    else:
+        # WebGL keeps thousands of batch markers responsive where SVG traces stall the browser
+        fig = px.line(table_df, x='batch_number', y=metric, markers=True, render_mode='webgl', **kwargs)
+    if facet:
+        # Tables differ in size, so each panel keeps its own y range and is titled by table name only
+        fig.update_yaxes(matches=None, showticklabels=True)
+        fig.for_each_annotation(lambda a: a.update(text=a.text.split('=', 1)[-1]))
+    # A stable uirevision keeps the user's zoom and pan when the chart is redrawn on a rerun
+    fig.update_layout(height=height, showlegend=False, uirevision=metric)
+    return fig
+
+
+@st.cache_resource(max_entries=64, show_spinner=False)
+def _saved_batch_chart(path_str: str, mtime: float, table, metric: str, title: str, height: int,
+                       all_points: bool) -> go.Figure:
+    """_batch_chart for a saved stats file, built once per file version; table None facets all tables"""
+    if table is None:
+        table_df = _load_stats_frame(path_str, mtime)
+    else:
+        table_df = _load_table_frames(path_str, mtime)[table]
+    return _batch_chart(table_df, metric, title, height, facet=table is None, all_points=all_points)
+
+
+def _get_batch_chart(table_df: pd.DataFrame, file_path, table, metric: str, title: str,
+                     height: int, all_points: bool = False) -> go.Figure:
+    """Chart of one table's batches (table_df), or of all tables faceted when table is None;
+    cached when they come from a saved stats file"""
+    if file_path:
+        return _saved_batch_chart(file_path, os.path.getmtime(file_path), table, metric, title, height,
+                                  all_points)
+    return _batch_chart(table_df, metric, title, height, facet=table is None, all_points=all_points)
 
 
 def load_saved_migration_stats(test_output_dir: Path = None):
@@ -19,15 +133,15 @@ def load_saved_migration_stats(test_output_dir: Path = None):
     else:
         stats_file = Path("migration_outputs/migration_stats.json")
 
-    if stats_file.exists():
-        try:
-            with open(stats_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get('batches', []), str(stats_file)
-        except Exception as e:
-            st.error(f"통계 파일 로드 중 오류 발생: {e}")
-            return [], None
-    return [], None
+    # The stat doubles as the existence check; a missing file costs one failed syscall
+    try:
+        data = _load_json(str(stats_file), stats_file.stat().st_mtime)
+        return data.get('batches', []), str(stats_file)
+    except FileNotFoundError:
+        return [], None
+    except Exception as e:
+        st.error(f"통계 파일 로드 중 오류 발생: {e}")
+        return [], None
 
 
 def load_test_results(test_output_dir: Path = None):
@@ -37,27 +151,32 @@ def load_test_results(test_output_dir: Path = None):
     else:
         results_file = Path("migration_outputs/migration_results.json")
 
-    if results_file.exists():
-        try:
-            with open(results_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            st.error(f"결과 파일 로드 중 오류 발생: {e}")
-            return None
-    return None
+    try:
+        return _load_json(str(results_file), results_file.stat().st_mtime)
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        st.error(f"결과 파일 로드 중 오류 발생: {e}")
+        return None
 
 
+# A fragment, so changing the table filter reruns only this section instead of the whole page
+@st.fragment
 def render_batch_statistics(batch_stats, data_source="real-time", file_path=None):
     """Render batch statistics section with filtering and charts"""
     if not batch_stats:
         return
 
-    # Create DataFrame from batch stats
-    df_batch_stats = pd.DataFrame(batch_stats)
+    # Create DataFrame from batch stats; a saved file is converted once per file version
+    if file_path:
+        file_mtime = os.path.getmtime(file_path)
+        df_batch_stats = _load_stats_frame(file_path, file_mtime)
+    else:
+        df_batch_stats = _stats_frame(batch_stats)
 
     # Data source indicator
     if data_source == "saved" and file_path:
-        mod_time = datetime.fromtimestamp(os.path.getmtime(file_path))
+        mod_time = datetime.fromtimestamp(file_mtime)
         st.info(f"📁 저장된 데이터 (마지막 업데이트: {mod_time.strftime('%Y-%m-%d %H:%M:%S')})")
     elif data_source == "real-time":
         st.success("🔴 실시간 데이터")
@@ -74,25 +193,23 @@ def render_batch_statistics(batch_stats, data_source="real-time", file_path=None
 
     # Filter data based on selection
     if filter_option == "전체":
-        filtered_stats = batch_stats
         filtered_df = df_batch_stats
     else:
-        filtered_stats = [s for s in batch_stats if s['table_name'] == filter_option]
-        filtered_df = df_batch_stats[df_batch_stats['table_name'] == filter_option].copy()
-        # Reset batch numbers for filtered view
-        filtered_df['batch_number'] = range(1, len(filtered_df) + 1)
+        if file_path:
+            filtered_df = _load_table_frames(file_path, file_mtime)[filter_option]
+        else:
+            filtered_df = _split_tables(df_batch_stats)[filter_option]
 
     # Performance metrics
-    if len(filtered_stats) > 0:
-        latest_stats = filtered_stats[-1]
-        recent_stats = filtered_stats[-min(5, len(filtered_stats)):]
-        avg_recent_rps = sum(s['records_per_second'] for s in recent_stats) / len(recent_stats)
-        avg_duration = sum(s['total_duration_seconds'] for s in filtered_stats) / len(filtered_stats)
-        total_records = sum(s['records_count'] for s in filtered_stats)
+    if len(filtered_df):
+        latest_stats = filtered_df.iloc[-1]
+        avg_recent_rps = filtered_df['records_per_second'].tail(5).mean()
+        avg_duration = filtered_df['total_duration_seconds'].mean()
+        total_records = filtered_df['records_count'].sum()
 
         col1, col2, col3, col4, col5 = st.columns(5)
         with col1:
-            st.metric("총 배치", len(filtered_stats))
+            st.metric("총 배치", len(filtered_df))
         with col2:
             st.metric("총 레코드", f"{total_records:,}")
         with col3:
@@ -104,125 +221,45 @@ def render_batch_statistics(batch_stats, data_source="real-time", file_path=None
 
     # Charts
     if not filtered_df.empty:
+        all_points = False
+        if filtered_df.groupby('table_name').size().max() > MAX_CHART_POINTS:
+            all_points = st.toggle(
+                "모든 포인트 표시",
+                key=f"all_points_{data_source}",
+                help=f"테이블당 배치가 {MAX_CHART_POINTS:,}개를 넘으면 차트는 LTTB로 다운샘플링됩니다."
+            )
+
         if filter_option == "전체":
-            # Show separate charts for each table
-            st.markdown("### 배치별 처리 시간 추이")
-            cols = st.columns(2)
-            for idx, table in enumerate(unique_tables):
-                table_df = filtered_df[filtered_df['table_name'] == table].copy()
-                table_df['batch_number'] = range(1, len(table_df) + 1)
-
-                with cols[idx % 2]:
-                    fig = px.line(
-                        table_df,
-                        x='batch_number',
-                        y='total_duration_seconds',
-                        title=f'{table}',
-                        labels={
-                            'batch_number': '배치 번호',
-                            'total_duration_seconds': '처리 시간 (초)'
-                        },
-                        markers=True
-                    )
-                    fig.update_layout(height=300, showlegend=False)
-                    st.plotly_chart(fig, use_container_width=True)
-
-            st.markdown("### 배치별 처리량 추이")
-            cols = st.columns(2)
-            for idx, table in enumerate(unique_tables):
-                table_df = filtered_df[filtered_df['table_name'] == table].copy()
-                table_df['batch_number'] = range(1, len(table_df) + 1)
-
-                with cols[idx % 2]:
-                    fig = px.line(
-                        table_df,
-                        x='batch_number',
-                        y='records_per_second',
-                        title=f'{table}',
-                        labels={
-                            'batch_number': '배치 번호',
-                            'records_per_second': '처리량 (records/sec)'
-                        },
-                        markers=True
-                    )
-                    fig.update_layout(height=300, showlegend=False)
-                    st.plotly_chart(fig, use_container_width=True)
-
-            # Cumulative records chart
-            if 'cumulative_records' in filtered_df.columns:
-                st.markdown("### 누적 레코드 수")
-                cols = st.columns(2)
-                for idx, table in enumerate(unique_tables):
-                    table_df = filtered_df[filtered_df['table_name'] == table].copy()
-                    table_df['batch_number'] = range(1, len(table_df) + 1)
-
-                    with cols[idx % 2]:
-                        fig = px.area(
-                            table_df,
-                            x='batch_number',
-                            y='cumulative_records',
-                            title=f'{table}',
-                            labels={
-                                'batch_number': '배치 번호',
-                                'cumulative_records': '누적 레코드 수'
-                            }
-                        )
-                        fig.update_layout(height=300, showlegend=False)
-                        st.plotly_chart(fig, use_container_width=True)
+            # One faceted figure per metric, a panel for each table
+            for title, metric in (("배치별 처리 시간 추이", 'total_duration_seconds'),
+                                  ("배치별 처리량 추이", 'records_per_second'),
+                                  ("누적 레코드 수", 'cumulative_records')):
+                if metric not in filtered_df.columns:
+                    continue
+                fig = _get_batch_chart(df_batch_stats, file_path, None, metric, title, 300, all_points)
+                st.plotly_chart(fig, use_container_width=True)
         else:
             # Single table selected - show single charts
-            fig_realtime = px.line(
-                filtered_df,
-                x='batch_number',
-                y='total_duration_seconds',
-                title=f'배치별 처리 시간 추이 - {filter_option}',
-                labels={
-                    'batch_number': '배치 번호',
-                    'total_duration_seconds': '처리 시간 (초)'
-                },
-                markers=True
-            )
-            fig_realtime.update_layout(height=400)
-            st.plotly_chart(fig_realtime, use_container_width=True)
-
-            # Throughput trend
-            fig_throughput_realtime = px.line(
-                filtered_df,
-                x='batch_number',
-                y='records_per_second',
-                title=f'배치별 처리량 추이 - {filter_option}',
-                labels={
-                    'batch_number': '배치 번호',
-                    'records_per_second': '처리량 (records/sec)'
-                },
-                markers=True
-            )
-            fig_throughput_realtime.update_layout(height=400)
-            st.plotly_chart(fig_throughput_realtime, use_container_width=True)
-
-            # Cumulative records chart
-            if 'cumulative_records' in filtered_df.columns:
-                fig_cumulative = px.area(
-                    filtered_df,
-                    x='batch_number',
-                    y='cumulative_records',
-                    title=f'누적 레코드 수 - {filter_option}',
-                    labels={
-                        'batch_number': '배치 번호',
-                        'cumulative_records': '누적 레코드 수'
-                    }
-                )
-                fig_cumulative.update_layout(height=400)
-                st.plotly_chart(fig_cumulative, use_container_width=True)
+            for title, metric in ((f'배치별 처리 시간 추이 - {filter_option}', 'total_duration_seconds'),
+                                  (f'배치별 처리량 추이 - {filter_option}', 'records_per_second'),
+                                  (f'누적 레코드 수 - {filter_option}', 'cumulative_records')):
+                if metric not in filtered_df.columns:
+                    continue
+                fig = _get_batch_chart(filtered_df, file_path, filter_option, metric, title, 400, all_points)
+                st.plotly_chart(fig, use_container_width=True)
 
         # Performance degradation warning (for filtered data)
-        if len(filtered_stats) >= 3:
-            recent_times = [s['total_duration_seconds'] for s in filtered_stats[-3:]]
-            if all(recent_times[i] < recent_times[i+1] for i in range(len(recent_times)-1)):
-                warning_msg = "⚠️ 성능 저하 감지: 최근 3개 배치의 처리 시간이 계속 증가하고 있습니다."
-                if filter_option != "전체":
-                    warning_msg += f" (테이블: {filter_option})"
-                st.warning(warning_msg)
+        durations = filtered_df['total_duration_seconds'].to_numpy(dtype=float)
+        table_note = f" (테이블: {filter_option})" if filter_option != "전체" else ""
+        if durations.size >= DEGRADATION_WINDOW and np.all(np.diff(durations[-DEGRADATION_WINDOW:]) > 0):
+            st.warning(f"⚠️ 성능 저하 감지: 최근 {DEGRADATION_WINDOW}개 배치의 처리 시간이 계속 증가하고 있습니다."
+                       + table_note)
+        elif durations.size >= DRIFT_WINDOW:
+            recent = durations[-DRIFT_WINDOW:]
+            slope = np.polyfit(np.arange(DRIFT_WINDOW), recent, 1)[0]
+            if slope * DRIFT_WINDOW > DRIFT_THRESHOLD * recent.mean():
+                st.warning(f"⚠️ 점진적 성능 저하 감지: 최근 {DRIFT_WINDOW}개 배치의 처리 시간이 "
+                           f"{slope * 1000:.1f}ms/배치 추세로 증가하고 있습니다." + table_note)
 
 
 def render_analysis_tab():
@@ -230,7 +267,7 @@ def render_analysis_tab():
     st.header("📈 상세 분석")
 
     # Initialize test run manager
-    test_manager = TestRunManager()
+    test_manager = get_test_run_manager()
 
     # Get all completed test runs
     all_test_runs = test_manager.get_test_runs_by_status("completed")
@@ -282,17 +319,16 @@ def render_analysis_tab():
             # File results table
             file_results = results.get('file_results', [])
             if file_results:
-                df_file_results = pd.DataFrame(file_results)
-                # Select and rename columns
-                display_cols = ['filename', 'table', 'status', 'records_inserted']
-                df_display = df_file_results[display_cols].copy()
-                df_display.columns = ['파일명', '테이블', '상태', '삽입된 레코드']
-                df_display['상태'] = df_display['상태'].map({
-                    'success': '✅ 성공',
-                    'error': '❌ 실패',
-                    'skipped': '⚠️ 건너뜀'
-                })
-                st.dataframe(df_display, use_container_width=True)
+                results_file = test_output_dir / "migration_results.json"
+                df_display = _file_results_frame(str(results_file), results_file.stat().st_mtime)
+                st.dataframe(
+                    df_display,
+                    use_container_width=True,
+                    column_config={
+                        '상태': st.column_config.TextColumn(width='small'),
+                        '삽입된 레코드': st.column_config.NumberColumn(format='%d')
+                    }
+                )
             else:
                 st.info("파일별 결과 데이터가 없습니다.")
         else:
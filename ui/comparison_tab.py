@@ -5,9 +5,10 @@ Provides visualization and analysis of performance across different configuratio
 import streamlit as st
 import pandas as pd
 import plotly.express as px
-import plotly.graph_objects as go
 from pathlib import Path
 from services.migration.test_run_manager import TestRunManager
+from utils.session_state import get_test_run_manager
+from utils.downsample import MAX_CHART_POINTS, downsample_frame
 from utils.comparison_utils import (
     calculate_performance_metrics,
     analyze_performance_comparison,
@@ -15,13 +16,21 @@ from utils.comparison_utils import (
     get_test_summary
 )
 
+# Batch time components and their legend names in the time breakdown chart
+_TIME_COMPONENTS = {
+    'data_preparation_time': 'Data Preparation',
+    'query_execution_time': 'Query Execution',
+    'commit_time': 'Commit',
+    'overhead_time': 'Overhead'
+}
+
 
 def render_comparison_tab():
     """Render test comparison tab"""
     st.header("📊 테스트 결과 비교")
 
     # Initialize test run manager
-    test_manager = TestRunManager()
+    test_manager = get_test_run_manager()
 
     # Get all test runs
     all_test_runs = test_manager.get_all_test_runs()
@@ -219,8 +228,22 @@ def render_comparison_analysis(selected_tests: list, test_manager: TestRunManage
     batch_df = prepare_batch_comparison_data(selected_tests, test_manager.base_output_dir)
 
     if not batch_df.empty:
+        # Number each test's batches in recorded order. Stored batch numbers restart for every file and
+        # parallel runs record batches as they finish, so they are not a monotonic x for the overlay or LTTB
+        batch_df['batch_number'] = batch_df.groupby('test_id').cumcount() + 1
+
+        # Tests with long histories are thinned per trace with LTTB unless all points are requested
+        all_points = False
+        if batch_df.groupby('test_id').size().max() > MAX_CHART_POINTS:
+            all_points = st.toggle(
+                "모든 포인트 표시",
+                key="comparison_all_points",
+                help=f"테스트당 배치가 {MAX_CHART_POINTS:,}개를 넘으면 차트는 LTTB로 다운샘플링됩니다."
+            )
+
         fig_batch = px.line(
-            batch_df,
+            batch_df if all_points else downsample_frame(batch_df, 'batch_number', 'total_duration_seconds',
+                                                         by='test_id'),
             x='batch_number',
             y='total_duration_seconds',
             color='test_label',
@@ -230,15 +253,17 @@ def render_comparison_analysis(selected_tests: list, test_manager: TestRunManage
                 'total_duration_seconds': '처리 시간 (초)',
                 'test_label': '테스트'
             },
-            markers=True
+            markers=True,
+            render_mode='webgl'
         )
-        fig_batch.update_layout(height=500)
+        fig_batch.update_layout(height=500, uirevision='batch_duration')
         st.plotly_chart(fig_batch, use_container_width=True)
 
         # Chart 4: Batch-level throughput overlay
         st.markdown("#### 📈 배치별 처리량 추이 (오버레이)")
         fig_batch_rps = px.line(
-            batch_df,
+            batch_df if all_points else downsample_frame(batch_df, 'batch_number', 'records_per_second',
+                                                         by='test_id'),
             x='batch_number',
             y='records_per_second',
             color='test_label',
@@ -248,58 +273,30 @@ def render_comparison_analysis(selected_tests: list, test_manager: TestRunManage
                 'records_per_second': '처리량 (records/sec)',
                 'test_label': '테스트'
             },
-            markers=True
+            markers=True,
+            render_mode='webgl'
         )
-        fig_batch_rps.update_layout(height=500)
+        fig_batch_rps.update_layout(height=500, uirevision='batch_throughput')
         st.plotly_chart(fig_batch_rps, use_container_width=True)
 
         # Chart 5: Time breakdown comparison (stacked bar)
         st.markdown("#### ⏱️ 시간 구성 비교 (평균)")
-        time_breakdown = batch_df.groupby('test_label').agg({
-            'data_preparation_time': 'mean',
-            'query_execution_time': 'mean',
-            'commit_time': 'mean',
-            'overhead_time': 'mean'
-        }).reset_index()
-
-        fig_breakdown = go.Figure()
-        fig_breakdown.add_trace(go.Bar(
-            name='Data Preparation',
-            x=time_breakdown['test_label'],
-            y=time_breakdown['data_preparation_time'],
-            text=time_breakdown['data_preparation_time'].round(3),
-            textposition='inside'
-        ))
-        fig_breakdown.add_trace(go.Bar(
-            name='Query Execution',
-            x=time_breakdown['test_label'],
-            y=time_breakdown['query_execution_time'],
-            text=time_breakdown['query_execution_time'].round(3),
-            textposition='inside'
-        ))
-        fig_breakdown.add_trace(go.Bar(
-            name='Commit',
-            x=time_breakdown['test_label'],
-            y=time_breakdown['commit_time'],
-            text=time_breakdown['commit_time'].round(3),
-            textposition='inside'
-        ))
-        fig_breakdown.add_trace(go.Bar(
-            name='Overhead',
-            x=time_breakdown['test_label'],
-            y=time_breakdown['overhead_time'],
-            text=time_breakdown['overhead_time'].round(3),
-            textposition='inside'
-        ))
-
-        fig_breakdown.update_layout(
-            barmode='stack',
+        time_breakdown = batch_df.groupby('test_label')[list(_TIME_COMPONENTS)].mean().reset_index()
+        # Long form, one row per (test, component), so a single px.bar stacks all components
+        time_breakdown = time_breakdown.melt(id_vars='test_label', var_name='component', value_name='seconds')
+        time_breakdown['component'] = time_breakdown['component'].map(_TIME_COMPONENTS)
+
+        fig_breakdown = px.bar(
+            time_breakdown,
+            x='test_label',
+            y='seconds',
+            color='component',
+            text=time_breakdown['seconds'].round(3),
             title='배치 처리 시간 구성 비교 (평균)',
-            xaxis_title='테스트',
-            yaxis_title='시간 (초)',
-            height=500,
-            xaxis_tickangle=-45
+            labels={'test_label': '테스트', 'seconds': '시간 (초)', 'component': ''}
         )
+        fig_breakdown.update_traces(textposition='inside')
+        fig_breakdown.update_layout(barmode='stack', height=500, xaxis_tickangle=-45)
         st.plotly_chart(fig_breakdown, use_container_width=True)
 
     # Configuration comparison
@@ -10,7 +10,7 @@ import os
 import json
 from pathlib import Path
 from services.migration.stats_writer import StatsWriter
-from services.migration.test_run_manager import TestRunManager
+from utils.session_state import get_test_run_manager
 
 
 def render_migration_tab():
@@ -125,7 +125,7 @@ def render_migration_tab():
         st.subheader("📋 최근 테스트 실행")
 
         # Initialize test run manager
-        test_manager = TestRunManager()
+        test_manager = get_test_run_manager()
 
         # Get recent test runs
         recent_runs = test_manager.get_recent_test_runs(limit=5)
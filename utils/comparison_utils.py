@@ -2,34 +2,30 @@
 Comparison utilities for analyzing multiple test runs
 Provides functions for merging, analyzing, and visualizing test comparisons
 """
-import json
 from pathlib import Path
 from typing import Dict, Any, List, Optional
+import msgspec
 import pandas as pd
 
 
 def load_test_stats(test_output_dir: Path) -> Optional[Dict[str, Any]]:
     """Load statistics from a test run directory"""
     stats_file = test_output_dir / "migration_stats.json"
-    if stats_file.exists():
-        try:
-            with open(stats_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception:
-            return None
-    return None
+    try:
+        with open(stats_file, 'rb') as f:
+            return msgspec.json.decode(f.read())
+    except Exception:
+        return None
 
 
 def load_test_results(test_output_dir: Path) -> Optional[Dict[str, Any]]:
     """Load results from a test run directory"""
     results_file = test_output_dir / "migration_results.json"
-    if results_file.exists():
-        try:
-            with open(results_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception:
-            return None
-    return None
+    try:
+        with open(results_file, 'rb') as f:
+            return msgspec.json.decode(f.read())
+    except Exception:
+        return None
 
 
 def merge_test_data(test_runs: List[Dict[str, Any]], base_output_dir: Path) -> List[Dict[str, Any]]:
@@ -0,0 +1,77 @@
+"""
+Downsampling utilities for charting long batch histories
+Largest-Triangle-Three-Buckets keeps the visual shape of a series with a fixed number of points
+"""
+from typing import Optional
+import numpy as np
+import pandas as pd
+
+# Points per trace above which charts are downsampled
+MAX_CHART_POINTS = 2000
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Select the points of a series kept by Largest-Triangle-Three-Buckets
+
+    Args:
+        x: Ascending x values
+        y: y values, same length as x
+        n_out: Number of points to keep
+
+    Returns:
+        Sorted positions of the kept points, always including the first and last
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # The first and last points are kept; the rest are split into n_out - 2 buckets
+    edges = (np.arange(n_out - 1) * (n - 2) / (n_out - 2)).astype(int) + 1
+    edges[-1] = n - 1
+
+    selected = np.empty(n_out, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    prev = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        # Pick the point forming the largest triangle with the previous pick and the next bucket's mean
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs((x[prev] - avg_x) * (y[start:end] - y[prev])
+                      - (x[prev] - x[start:end]) * (avg_y - y[prev]))
+        prev = start + int(np.argmax(area))
+        selected[i + 1] = prev
+    return selected
+
+
+def downsample_frame(df: pd.DataFrame, x: str, y: str, n_out: int = MAX_CHART_POINTS,
+                     by: Optional[str] = None) -> pd.DataFrame:
+    """
+    Reduce each series of a DataFrame to at most n_out rows with LTTB
+
+    Args:
+        df: Rows sorted by x within each series
+        x: Column plotted on the x axis
+        y: Column plotted on the y axis
+        n_out: Maximum rows kept per series
+        by: Column identifying separate series (e.g. one trace per table), or None for a single series
+
+    Returns:
+        The kept rows in their original order; df itself when no series exceeds n_out
+    """
+    if by is None:
+        groups = [np.arange(len(df))]
+    else:
+        groups = list(df.groupby(by, sort=False).indices.values())
+    if all(len(positions) <= n_out for positions in groups):
+        return df
+
+    x_values = df[x].to_numpy(dtype=float)
+    y_values = df[y].to_numpy(dtype=float)
+    kept = [positions[lttb_indices(x_values[positions], y_values[positions], n_out)] for positions in groups]
+    return df.iloc[np.sort(np.concatenate(kept))]
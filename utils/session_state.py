@@ -2,6 +2,13 @@
 Session state initialization and management for Streamlit app
 """
 import streamlit as st
+from services.migration.test_run_manager import TestRunManager
+
+
+@st.cache_resource(show_spinner=False)
+def get_test_run_manager() -> TestRunManager:
+    """TestRunManager shared across reruns, so the run index is re-read only when the file changes"""
+    return TestRunManager()
 
 
 def initialize_session_state():
@@ -25,4 +32,4 @@ def initialize_session_state():
     if 'migration_migrator' not in st.session_state:
         st.session_state.migration_migrator = None
     if 'migration_initial_counts' not in st.session_state:
-        st.session_state.migration_initial_counts = {}
\ No newline at end of file
+        st.session_state.migration_initial_counts = {}